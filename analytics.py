@@ -0,0 +1,142 @@
+"""Aggregate statistics over a columnar game log (see game_log.py), vectorised over every game at once.
+
+Usage:
+    python analytics.py --log-dir game_log
+"""
+
+import argparse
+
+import numpy as np
+
+from game_log import ELIMINATION, PHASES, ROLES, SEER_REVEAL, VOTE, WINNERS, GameLogTables, load_game_log
+
+VILLAGERS_WON = WINNERS.index("villagers")
+WEREWOLVES_WON = WINNERS.index("werewolves")
+WEREWOLF = ROLES.index("werewolf")
+DAY = PHASES.index("day")
+
+
+def role_lookup(log: GameLogTables) -> np.ndarray:
+    """A (games, max player id + 1) array of role codes, -1 where there's no such player."""
+    roles = np.full((len(log.games), int(log.players["player"].max(initial=0)) + 1), -1, dtype=np.int8)
+    roles[log.players["game"], log.players["player"]] = log.players["role"]
+    return roles
+
+
+def roles_of(roles: np.ndarray, games: np.ndarray, players: np.ndarray) -> np.ndarray:
+    """The role codes of the given players in the given games, -1 for players outside the lookup."""
+    in_range = np.asarray(players) < roles.shape[1]
+    result = np.full(len(in_range), -1, dtype=np.int8)
+    result[in_range] = roles[np.asarray(games)[in_range], np.asarray(players)[in_range]]
+    return result
+
+
+def role_counts(log: GameLogTables) -> np.ndarray:
+    """A (games, roles) array of how many of each role were dealt in each game."""
+    counts = np.zeros((len(log.games), len(ROLES)), dtype=np.int32)
+    np.add.at(counts, (log.players["game"], log.players["role"]), 1)
+    return counts
+
+
+def win_rates_by_config(log: GameLogTables) -> list[dict]:
+    """Games played and villager/werewolf win rates for each distinct set of dealt roles."""
+    configs, config_of_game = np.unique(role_counts(log), axis=0, return_inverse=True)
+    config_of_game = config_of_game.reshape(-1)
+    games = np.bincount(config_of_game, minlength=len(configs))
+    winners = np.asarray(log.games["winner"])
+    villager_wins = np.bincount(config_of_game, weights=winners == VILLAGERS_WON, minlength=len(configs))
+    werewolf_wins = np.bincount(config_of_game, weights=winners == WEREWOLVES_WON, minlength=len(configs))
+    return [
+        {
+            "roles": {ROLES[r]: int(n) for r, n in enumerate(config) if n},
+            "games": int(games[i]),
+            "villager_win_rate": villager_wins[i] / games[i],
+            "werewolf_win_rate": werewolf_wins[i] / games[i],
+        }
+        for i, config in enumerate(configs)
+    ]
+
+
+def vote_accuracy(log: GameLogTables, roles: np.ndarray) -> dict[str, float]:
+    """For day votes by each role, the fraction cast against a werewolf."""
+    votes = log.events[(log.events["kind"] == VOTE) & (log.events["phase"] == DAY)]
+    voter_roles = roles_of(roles, votes["game"], votes["actor"])
+    # Votes for players who weren't dealt in count as missing a werewolf
+    against_werewolf = roles_of(roles, votes["game"], votes["target"]) == WEREWOLF
+    known_voter = voter_roles >= 0
+    voter_roles, against_werewolf = voter_roles[known_voter], against_werewolf[known_voter]
+    cast = np.bincount(voter_roles, minlength=len(ROLES))
+    hits = np.bincount(voter_roles, weights=against_werewolf, minlength=len(ROLES))
+    accuracy = {ROLES[r]: hits[r] / cast[r] for r in range(len(ROLES)) if cast[r]}
+    villager_team = voter_roles != WEREWOLF
+    if villager_team.any():
+        accuracy["villager team"] = against_werewolf[villager_team].mean()
+    return accuracy
+
+
+def seer_reveal_effect(log: GameLogTables, roles: np.ndarray) -> dict[str, float]:
+    """Villager win rates in games with a seer, split by whether the seer ever saw a werewolf."""
+    counts = role_counts(log)
+    has_seer = counts[:, ROLES.index("seer")] > 0
+    reveals = log.events[log.events["kind"] == SEER_REVEAL]
+    found_werewolf = np.zeros(len(log.games), dtype=bool)
+    found_werewolf[reveals["game"][roles_of(roles, reveals["game"], reveals["target"]) == WEREWOLF]] = True
+
+    villagers_won = np.asarray(log.games["winner"]) == VILLAGERS_WON
+
+    def win_rate(games: np.ndarray) -> float:
+        return float(villagers_won[games].mean()) if games.any() else 0.0
+
+    return {
+        "games with a seer": int(has_seer.sum()),
+        "seer found a werewolf": int((has_seer & found_werewolf).sum()),
+        "villager win rate when the seer found a werewolf": win_rate(has_seer & found_werewolf),
+        "villager win rate otherwise": win_rate(has_seer & ~found_werewolf),
+    }
+
+
+def round_lengths(log: GameLogTables) -> dict[str, object]:
+    """The distribution of game lengths in rounds, and of how many eliminations happened in each round."""
+    rounds = np.asarray(log.games["rounds"])
+    eliminations = log.events[log.events["kind"] == ELIMINATION]
+    return {
+        "rounds per game": {int(r): int(n) for r, n in enumerate(np.bincount(rounds)) if n},
+        "mean rounds": rounds.mean() if len(rounds) else 0.0,
+        "eliminations by round": {int(r): int(n) for r, n in enumerate(np.bincount(eliminations["round"])) if n},
+    }
+
+
+def report(log: GameLogTables) -> str:
+    roles = role_lookup(log)
+    lines = [f"{len(log.games)} games, {len(log.players)} players, {len(log.events)} events"]
+
+    lines.append("Win rates by role configuration:")
+    for config in sorted(win_rates_by_config(log), key=lambda c: -c["games"]):
+        mix = ", ".join(f"{n} {role}" for role, n in config["roles"].items())
+        lines.append(
+            f"  {mix:<40}{config['games']:>8} games  villagers {config['villager_win_rate']:.1%}"
+            f"  werewolves {config['werewolf_win_rate']:.1%}"
+        )
+
+    lines.append("Day votes cast against a werewolf:")
+    lines.extend(f"  {role:<16}{accuracy:.1%}" for role, accuracy in vote_accuracy(log, roles).items())
+
+    lines.append("Seer reveals:")
+    for name, value in seer_reveal_effect(log, roles).items():
+        lines.append(f"  {name}: {value:.1%}" if isinstance(value, float) else f"  {name}: {value}")
+
+    lengths = round_lengths(log)
+    lines.append(f"Rounds per game (mean {lengths['mean rounds']:.2f}): {lengths['rounds per game']}")
+    lines.append(f"Eliminations by round: {lengths['eliminations by round']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report on the games in a columnar game log.")
+    parser.add_argument("--log-dir", default="game_log", help="Directory the game log was written to")
+    args = parser.parse_args()
+    print(report(load_game_log(args.log_dir)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Command line entry point for playing AutoWolf without (or with) the Chainlit UI.
+
+Usage:
+    python -m autowolf run --roles villager,villager,villager,werewolf,seer
+    python -m autowolf run --players 12 --client-factory clients.stand_in_client:StandInChatCompletionClient
+    python -m autowolf ui
+
+Modules are imported by the command that needs them, so `run` never loads Chainlit or the UI. Before loading the
+game, `run` starts fetching the Azure credential's token in a thread, overlapping the two, then opens the model
+clients' connections, so the first model call doesn't pay for either. It reports how long startup took.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+LAUNCHED = time.time()
+
+
+def cold_start_summary(
+    timings: dict[str, float], first_call_at: Optional[float], first_response_at: Optional[float]
+) -> str:
+    steps = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    if first_call_at is None or first_response_at is None:
+        return f"Cold start: {steps}; no model calls were made"
+    return (
+        f"Cold start: {steps}; first model call sent {first_call_at - LAUNCHED:.2f}s and answered "
+        f"{first_response_at - LAUNCHED:.2f}s after launch"
+    )
+
+
+async def play(
+    args: argparse.Namespace,
+    roles: list[str],
+    model_config: dict,
+    credential: Optional[Future],
+    timings: dict[str, float],
+):
+    # The slowest part of startup, which the credential's token fetch (if any) overlaps
+    start = time.perf_counter()
+    from clients.client_pool import client_pool
+    from discussion import DiscussionLimits
+    from game import WerewolfGame
+    from models.agent_vote_response import AgentVoteResponse
+    from models.seer_choice_response import SeerChoiceResponse
+    from roles.deck import role_classes
+    from telemetry import recorder
+    from ui.headless_message_handler import ConsoleMessageHandler, JsonlMessageHandler, NullMessageHandler
+
+    if args.client_factory:
+        from simulation import load_client_factory
+
+        client_pool.client_factory = load_client_factory(args.client_factory)
+    else:
+        from config import load_model_router, load_request_scheduler, load_response_cache
+
+        client_pool.cache = load_response_cache()
+        client_pool.scheduler = load_request_scheduler()
+        client_pool.router = load_model_router()
+    timings["imports"] = time.perf_counter() - start
+
+    async def prewarm():
+        if credential is not None:
+            timings["credential (in the background)"] = await asyncio.wrap_future(credential)
+        # The settings of the clients players' discussions, reflections, votes and seer choices use
+        client_args = [
+            {},
+            {"parallel_tool_calls": False},
+            {"response_format": AgentVoteResponse},
+            {"response_format": SeerChoiceResponse},
+        ]
+        timings["connections"] = await client_pool.prewarm(model_config, client_args)
+
+    prewarming = asyncio.create_task(prewarm()) if args.prewarm else None
+    # Let the pre-warm start waiting on the credential before the (synchronous) game setup
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    if args.events:
+        message_handler = JsonlMessageHandler(args.events)
+    elif args.quiet:
+        message_handler = NullMessageHandler()
+    else:
+        message_handler = ConsoleMessageHandler()
+    game = WerewolfGame(
+        model_config,
+        message_handler,
+        role_classes(roles),
+        seed=args.seed,
+        discussion=args.discussion,
+        breakout_group_size=args.group_size,
+        discussion_limits=DiscussionLimits(timeout=args.discussion_timeout),
+        speculative_votes=args.speculative_votes,
+    )
+    timings["game setup"] = time.perf_counter() - start
+
+    try:
+        if prewarming is not None:
+            await prewarming
+        await game.run()
+    finally:
+        await message_handler.close()
+        await client_pool.close()
+        print(cold_start_summary(timings, recorder.first_call_at, recorder.first_response_at))
+
+
+def run(args: argparse.Namespace, parser: argparse.ArgumentParser):
+    from roles.deck import DEFAULT_ROLES, default_roles, parse_roles, validate_roles
+    from utils import configure_logging
+
+    configure_logging(logging.WARNING if args.quiet else logging.INFO)
+
+    if args.roles:
+        roles = parse_roles(args.roles)
+    else:
+        roles = default_roles(args.players) if args.players else DEFAULT_ROLES
+    try:
+        validate_roles(roles, args.players)
+    except ValueError as e:
+        parser.error(str(e))
+
+    timings: dict[str, float] = {}
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        credential = None
+        if args.client_factory:
+            model_config = {}
+        else:
+            from config import load_model_config, prewarm_credential
+
+            start = time.perf_counter()
+            model_config = load_model_config()
+            timings["model config"] = time.perf_counter() - start
+            if args.prewarm:
+                credential = executor.submit(prewarm_credential, model_config)
+
+        asyncio.run(play(args, roles, model_config, credential, timings))
+
+
+def ui(args: argparse.Namespace, parser: argparse.ArgumentParser):
+    from chainlit.cli import cli
+
+    cli(["run", "main.py", *args.chainlit_args])
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(prog="autowolf", description="Play AI games of Werewolf.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Play one game in the terminal, without the Chainlit UI")
+    run_parser.add_argument("--roles", help="Comma-separated roles to deal (default: 3 villagers, a werewolf, a seer)")
+    run_parser.add_argument(
+        "--players", type=int, help="Number of players (with --roles, checks they match; without, picks the roles)"
+    )
+    run_parser.add_argument("--seed", type=int, help="Seed for the role shuffle and tie-breaks")
+    run_parser.add_argument("--discussion", choices=["auto", "swarm", "breakout"], default="auto")
+    run_parser.add_argument("--group-size", type=int, default=5, help="Players per breakout group")
+    run_parser.add_argument("--discussion-timeout", type=float, default=60, help="Seconds each discussion may run")
+    run_parser.add_argument(
+        "--speculative-votes",
+        action="store_true",
+        help="Start each player's vote as soon as they're ready to vote, while the discussion goes on",
+    )
+    run_parser.add_argument(
+        "--client-factory",
+        help="Model client factory as module:attribute to use instead of Azure OpenAI "
+        "(e.g. clients.stand_in_client:StandInChatCompletionClient)",
+    )
+    run_parser.add_argument("--events", help="JSONL file to write the game's messages to instead of printing them")
+    run_parser.add_argument("--quiet", action="store_true", help="Don't print the game's messages")
+    run_parser.add_argument(
+        "--no-prewarm",
+        dest="prewarm",
+        action="store_false",
+        help="Don't fetch the credential or open connections before the first model call",
+    )
+    run_parser.set_defaults(handler=run)
+
+    ui_parser = commands.add_parser("ui", help="Serve the Chainlit UI (arguments are passed on to `chainlit run`)")
+    ui_parser.add_argument("chainlit_args", nargs=argparse.REMAINDER)
+    ui_parser.set_defaults(handler=ui)
+
+    args = parser.parse_args(argv)
+    args.handler(args, parser)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,158 @@
+"""Benchmark whole games offline against the deterministic stand-in model client.
+
+Plays seeded games at several table sizes with `StandInChatCompletionClient` in place of Azure OpenAI, so runs are
+free, repeatable and comparable across commits. For each size it reports:
+
+- framework overhead per phase: phase wall time with zero simulated model latency, i.e. everything that isn't the model
+- model calls per phase, and the average prompt tokens per call in each round (how fast prompts grow as a game goes on)
+- end to end game time with a realistic simulated latency
+- memory growth over a game (tracemalloc peak)
+
+Usage:
+    python -m benchmarks.game_benchmark [--players 5 15 50] [--latency 0.05] [--discussion auto] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections import defaultdict
+
+from clients.client_pool import client_pool
+from clients.stand_in_client import StandInChatCompletionClient
+from game import WerewolfGame
+from roles.deck import default_roles, role_classes
+from telemetry import Span, recorder
+from ui.headless_message_handler import NullMessageHandler
+
+PLAYERS = [5, 15, 50]
+SEEDS = [0, 1, 2]
+
+
+async def play(players: int, seed: int, latency: float, discussion: str = "auto") -> dict:
+    """Play one game and measure it from its telemetry spans."""
+    client_pool.client_factory = functools.partial(StandInChatCompletionClient, latency=latency)
+    game_id = f"bench_{players}_{seed}"
+    spans: list[Span] = []
+
+    def keep_spans(game: str, game_spans: list[Span]):
+        if game == game_id:
+            spans.extend(game_spans)
+
+    recorder.finish_hooks.append(keep_spans)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            game = WerewolfGame(
+                {},
+                NullMessageHandler(),
+                role_classes(default_roles(players)),
+                seed=seed,
+                game_id=game_id,
+                discussion=discussion,
+            )
+            start = time.perf_counter()
+            await game.run()
+            duration = time.perf_counter() - start
+    finally:
+        recorder.finish_hooks.remove(keep_spans)
+    await client_pool.close()
+
+    phases = [s for s in spans if s.name == "phase"]
+    calls = [s for s in spans if s.name == "model_call"]
+    prompt_tokens_by_round = defaultdict(list)
+    for call in calls:
+        prompt_tokens_by_round[call.attributes.get("round", 0)].append(call.attributes.get("prompt_tokens", 0))
+
+    return {
+        "duration_seconds": duration,
+        "rounds": game.round,
+        "phases": len(phases),
+        "phase_seconds": [p.duration for p in phases],
+        "calls": len(calls),
+        "prompt_tokens_by_round": {r: statistics.mean(t) for r, t in sorted(prompt_tokens_by_round.items())},
+    }
+
+
+async def benchmark(players: int, latency: float, discussion: str) -> dict:
+    overhead = [await play(players, seed, 0.0, discussion) for seed in SEEDS]
+    realistic = [await play(players, seed, latency, discussion) for seed in SEEDS]
+
+    tracemalloc.start()
+    await play(players, SEEDS[0], 0.0, discussion)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    phase_seconds = [s for r in overhead for s in r["phase_seconds"]]
+    phases = sum(r["phases"] for r in overhead)
+    rounds = defaultdict(list)
+    for r in overhead:
+        for game_round, tokens in r["prompt_tokens_by_round"].items():
+            rounds[game_round].append(tokens)
+
+    return {
+        "players": players,
+        "games": len(SEEDS),
+        "overhead_ms_per_phase": statistics.mean(phase_seconds) * 1000,
+        "overhead_ms_per_phase_max": max(phase_seconds) * 1000,
+        "calls_per_phase": sum(r["calls"] for r in overhead) / phases,
+        "prompt_tokens_per_call_by_round": {r: round(statistics.mean(t)) for r, t in sorted(rounds.items())},
+        "game_seconds": statistics.mean(r["duration_seconds"] for r in realistic),
+        "phase_seconds": statistics.mean(s for r in realistic for s in r["phase_seconds"]),
+        "peak_memory_mb": peak / 2**20,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main(players: list[int], latency: float, discussion: str, output: str | None):
+    print(
+        f"{'players':>8}{'overhead/phase (ms)':>21}{'max (ms)':>10}{'calls/phase':>13}"
+        f"{'phase (s)':>11}{'game (s)':>10}{'peak mem (MB)':>15}  prompt tokens/call by round"
+    )
+    results = []
+    for n in players:
+        result = await benchmark(n, latency, discussion)
+        results.append(result)
+        growth = ", ".join(f"{r}: {t}" for r, t in result["prompt_tokens_per_call_by_round"].items())
+        print(
+            f"{n:>8}{result['overhead_ms_per_phase']:>21.1f}{result['overhead_ms_per_phase_max']:>10.1f}"
+            f"{result['calls_per_phase']:>13.1f}{result['phase_seconds']:>11.2f}{result['game_seconds']:>10.2f}{result['peak_memory_mb']:>15.1f}  {growth}"
+        )
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "latency": latency,
+                    "discussion": discussion,
+                    "seeds": SEEDS,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, nargs="+", default=PLAYERS, help="table sizes to benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated model latency (seconds) for game time")
+    parser.add_argument(
+        "--discussion", choices=["auto", "swarm", "breakout"], default="auto", help="discussion mode for the games"
+    )
+    parser.add_argument("--output", help="write the results (tagged with the git commit) to this JSON file")
+    args = parser.parse_args()
+    asyncio.run(main(args.players, args.latency, args.discussion, args.output))
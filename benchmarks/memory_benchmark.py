@@ -0,0 +1,78 @@
+"""Compare retrieval latency and injected prompt size across player memory backends.
+
+Fills each memory with a synthetic game of N rounds (a handful of events and thoughts per round), then times
+`update_context` for a vote-style task and measures how much memory text it injects into the prompt.
+
+Usage:
+    python -m benchmarks.memory_benchmark
+"""
+
+import asyncio
+import random
+import time
+
+from autogen_core.memory import ListMemory, Memory, MemoryContent, MemoryMimeType
+from autogen_core.model_context import UnboundedChatCompletionContext
+from autogen_core.models import UserMessage
+
+from memory.round_window_memory import RoundWindowMemory
+from memory.vector_memory import VectorMemory
+
+ROUNDS = [10, 50, 200]
+ENTRIES_PER_ROUND = 12
+REPEATS = 20
+TASK = "HOST: use your memories and thoughts from previous discussions to determine the player you'd like to eliminate with a brief reason why."
+
+TEMPLATES = [
+    "HOST: Player {a} voted to eliminate Player {b} because they were too quiet during the discussion.",
+    "Player {a} claimed to be the seer and said Player {b} is a villager.",
+    "I suspect Player {a} is a werewolf because they defended Player {b} without reason.",
+    "HOST: Player {a} has been eliminated.",
+    "Player {a} and Player {b} keep voting together, they might both be werewolves.",
+]
+
+
+def synthetic_entries(rounds: int, rng: random.Random) -> list[MemoryContent]:
+    return [
+        MemoryContent(
+            content=rng.choice(TEMPLATES).format(a=rng.randint(1, 15), b=rng.randint(1, 15)),
+            mime_type=MemoryMimeType.TEXT,
+            metadata={"round": round},
+        )
+        for round in range(1, rounds + 1)
+        for _ in range(ENTRIES_PER_ROUND)
+    ]
+
+
+async def measure(memory: Memory, entries: list[MemoryContent]) -> tuple[float, int]:
+    """Average update_context latency (ms) and the number of characters of memory it injects."""
+    for entry in entries:
+        await memory.add(entry)
+
+    total = 0.0
+    injected = 0
+    for _ in range(REPEATS):
+        context = UnboundedChatCompletionContext(initial_messages=[UserMessage(content=TASK, source="host")])
+        start = time.perf_counter()
+        await memory.update_context(context)
+        total += time.perf_counter() - start
+        injected = sum(len(str(m.content)) for m in (await context.get_messages())[1:])
+    return total / REPEATS * 1000, injected
+
+
+async def main():
+    backends = {
+        "ListMemory": lambda: ListMemory(name="events"),
+        "RoundWindowMemory": lambda: RoundWindowMemory(name="events"),
+        "VectorMemory": lambda: VectorMemory(name="events"),
+    }
+    print(f"{'backend':<20}{'rounds':>8}{'entries':>10}{'latency (ms)':>15}{'prompt chars':>15}")
+    for rounds in ROUNDS:
+        entries = synthetic_entries(rounds, random.Random(rounds))
+        for name, create in backends.items():
+            latency, injected = await measure(create(), entries)
+            print(f"{name:<20}{rounds:>8}{len(entries):>10}{latency:>15.3f}{injected:>15}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+"""Compare the UI traffic of sending the whole task list after every task against batched, capped updates.
+
+Replays the tool-execution tasks of a synthetic game (each player records a few thoughts per phase) through
+TaskHandler, measuring task list round trips and bytes without needing a Chainlit session.
+
+Usage:
+    python -m benchmarks.task_list_benchmark
+"""
+
+import asyncio
+
+import chainlit as cl
+
+from ui.task_handler import TaskHandler
+
+PLAYERS = 15
+ROUNDS = 10
+THOUGHTS_PER_REFLECTION = 3
+# Simulated seconds between tool executions during a phase
+TASK_INTERVAL = 0.5
+
+
+class MeasuringTaskHandler(TaskHandler):
+    """A TaskHandler that measures what it would send instead of sending it."""
+
+    def __init__(self, *args, **kwargs):
+        # Drive the flush interval from a simulated clock rather than wall time
+        super().__init__(*args, clock=lambda: self.now, **kwargs)
+        self.now = 0.0
+
+    async def _get_task_list(self):
+        # There's no Chainlit session here to take the thread id from
+        if self._task_list is None:
+            self._task_list = cl.TaskList(thread_id="benchmark")
+        return self._task_list
+
+    async def _send(self, task_list: cl.TaskList):
+        await task_list.preprocess_content()
+
+
+async def play(handler: MeasuringTaskHandler):
+    for round in range(1, ROUNDS + 1):
+        for phase in ("day", "night"):
+            for player in range(1, PLAYERS + 1):
+                for thought in range(THOUGHTS_PER_REFLECTION):
+                    handler.now += TASK_INTERVAL
+                    await handler.send_task(f"Round {round} {phase}: Player {player} recorded thought {thought}")
+            await handler.flush()
+
+
+async def main():
+    handlers = {
+        "send every task, unbounded (before)": MeasuringTaskHandler(flush_interval=0, max_tasks=None),
+        "batched and capped (after)": MeasuringTaskHandler(),
+    }
+    print(f"{'policy':<40}{'round trips':>14}{'bytes':>14}")
+    for name, handler in handlers.items():
+        await play(handler)
+        print(f"{name:<40}{handler.round_trips:>14}{handler.bytes_sent:>14}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+import importlib
+import json
+import os
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from autogen_core.memory import MemoryContent
+
+if TYPE_CHECKING:
+    from game import WerewolfGame
+    from roles._role import Role
+
+
+def _class_path(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def load_class(path: str) -> type:
+    """Import a class given as `module:QualifiedName`."""
+    module_name, _, name = path.partition(":")
+    return getattr(importlib.import_module(module_name), name)
+
+
+def _rng_state_to_json(state: tuple) -> list:
+    version, internal, gauss = state
+    return [version, list(internal), gauss]
+
+
+def rng_state_from_json(state: list) -> tuple:
+    version, internal, gauss = state
+    return (version, tuple(internal), gauss)
+
+
+class GameCheckpointer:
+    """Append-only checkpoint log for a WerewolfGame, compacted into periodic snapshots.
+
+    After each phase only the delta is appended to `<path>.log.jsonl`: the eliminated player, the votes, new memory
+    entries and the round counter. Every `snapshot_every` phases the full state is written to `<path>.snapshot.json`
+    and the log is truncated, so loading only ever replays a bounded number of deltas.
+    """
+
+    def __init__(self, path: str, snapshot_every: int = 10):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.log_path = f"{path}.log.jsonl"
+        self.snapshot_path = f"{path}.snapshot.json"
+        self._seq = 0
+        self._deltas_since_snapshot = 0
+        # How many of each player's memory log entries have already been written
+        self._memory_offsets: dict[int, int] = {}
+        # How many of the game's logged events have already been written
+        self._events_offset = 0
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.log_path)
+
+    def _game_fields(self, game: "WerewolfGame") -> dict[str, Any]:
+        """The small, fully rewritten parts of the state that every delta carries."""
+        return {
+            "round": game.round,
+            "next_phase": game.next_phase,
+            "game_over": game.game_over,
+            "winner": game.winner,
+            "rng_state": _rng_state_to_json(game.rng.getstate()),
+        }
+
+    def _new_memories(self, player: "Role") -> list[list]:
+        offset = self._memory_offsets.get(player.id, 0)
+        entries = player.memory_log[offset:]
+        self._memory_offsets[player.id] = len(player.memory_log)
+        return [[name, content.model_dump(mode="json")] for name, content in entries]
+
+    async def save_phase(self, game: "WerewolfGame", eliminated_player: Optional[int] = None):
+        """Append the changes made by the phase that just finished."""
+        self._seq += 1
+        delta = {
+            "seq": self._seq,
+            **self._game_fields(game),
+            "eliminated": eliminated_player,
+            "votes": [
+                {"voter": voter, **vote.model_dump()} for voter, vote in zip(game.voters, game.votes, strict=True)
+            ],
+            "memories": {str(p.id): self._new_memories(p) for p in game.players},
+            "events": game.events.rows[self._events_offset :],
+        }
+        self._events_offset = len(game.events.rows)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(delta) + "\n")
+
+        self._deltas_since_snapshot += 1
+        if self._deltas_since_snapshot >= self.snapshot_every:
+            self.save_snapshot(game)
+
+    def save_snapshot(self, game: "WerewolfGame"):
+        """Write the full game state and truncate the log."""
+        for player in game.players:
+            self._memory_offsets[player.id] = len(player.memory_log)
+        self._events_offset = len(game.events.rows)
+        snapshot = {
+            "seq": self._seq,
+            **self._game_fields(game),
+            "game_id": game.game_id,
+            "dealt_roles": game.dealt_roles,
+            "eliminated_players": game.eliminated_players,
+            "seed": game.seed,
+            "events": game.events.rows,
+            "players": [
+                {
+                    "id": p.id,
+                    "class": _class_path(type(p)),
+                    "memories": [[name, content.model_dump(mode="json")] for name, content in p.memory_log],
+                }
+                for p in game.players
+            ],
+        }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.snapshot_path)
+        # The snapshot records its seq, so a crash before truncating just means some deltas get skipped on load
+        open(self.log_path, "w").close()
+        self._deltas_since_snapshot = 0
+
+    def load(self) -> dict[str, Any]:
+        """Rebuild the latest state from the snapshot plus any deltas logged after it."""
+        # The game's setup (its id, dealt roles and players) is only ever in a snapshot, written before any deltas
+        if not os.path.exists(self.snapshot_path):
+            raise FileNotFoundError(f"Can't resume from {self.path}: there's no snapshot of the game's setup")
+        with open(self.snapshot_path, encoding="utf-8") as f:
+            state = json.load(f)
+
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    delta = json.loads(line)
+                    if delta["seq"] > state["seq"]:
+                        self._apply(state, delta)
+
+        self._seq = state["seq"]
+        self._memory_offsets = {p["id"]: len(p["memories"]) for p in state["players"]}
+        self._events_offset = len(state.setdefault("events", []))
+        return state
+
+    @staticmethod
+    def _apply(state: dict[str, Any], delta: dict[str, Any]):
+        for key in ("seq", "round", "next_phase", "game_over", "winner", "rng_state"):
+            state[key] = delta[key]
+        for player in state["players"]:
+            player["memories"].extend(delta["memories"].get(str(player["id"]), []))
+        state.setdefault("events", []).extend(delta.get("events", []))
+        if delta["eliminated"] is not None:
+            state["eliminated_players"].append(delta["eliminated"])
+            state["players"] = [p for p in state["players"] if p["id"] != delta["eliminated"]]
+
+    async def restore_players(
+        self,
+        state: dict[str, Any],
+        model_config: dict[str, str],
+        message_handler,
+        memory_path: Callable[[int], Optional[str]] = lambda id: None,
+    ) -> list["Role"]:
+        """Recreate the remaining players with their memories, without any model calls.
+
+        `memory_path` gives the prefix of the files each player's memories are persisted to, if they are.
+        """
+        players = []
+        for p in state["players"]:
+            player = load_class(p["class"])(model_config, message_handler, p["id"], memory_path(p["id"]))
+            await player.restore_memories([(name, MemoryContent(**content)) for name, content in p["memories"]])
+            players.append(player)
+        return players
@@ -0,0 +1,169 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional, Sequence
+
+from autogen_core.models import ChatCompletionClient
+from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from pydantic import BaseModel
+
+from clients.model_router import ModelRouter, RoutedChatCompletionClient
+from clients.request_scheduler import PRIORITIES, DEFAULT_PRIORITY, RequestScheduler, ScheduledChatCompletionClient
+from clients.response_cache import CachingChatCompletionClient, ResponseCache
+
+
+@dataclass
+class ClientPoolStats:
+    """Counters showing how often a pooled client (and its HTTP connection pool) was reused."""
+
+    created: int = 0
+    reused: int = 0
+    setup_seconds: float = 0.0
+
+    @property
+    def average_setup_seconds(self) -> float:
+        return self.setup_seconds / self.created if self.created else 0.0
+
+    @property
+    def setup_seconds_saved(self) -> float:
+        """Estimated construction time avoided by handing out an existing client instead of a new one."""
+        return self.reused * self.average_setup_seconds
+
+    def summary(self) -> str:
+        return (
+            f"Model clients: {self.created} created, {self.reused} reused "
+            f"(~{self.average_setup_seconds * 1000:.1f}ms setup each, ~{self.setup_seconds_saved:.2f}s saved)"
+        )
+
+
+class ClientPool:
+    """Hands out model clients shared by all players, keyed by model config, response format and tool settings.
+
+    Each client owns its own HTTP connection pool and token provider, so sharing them means connections (and
+    their TLS handshakes) are reused across players and rounds rather than rebuilt on every call.
+
+    The underlying clients are wrapped per call type (discussion, vote, reflect, seer, summarise): if a request
+    scheduler is set every call is queued through it at that call type's priority, and if a response cache is set
+    every call records to / replays from it (cache hits skip the scheduler entirely). If a model router is set, each
+    call type is served by the model it's routed to, falling back to the given model config's model.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[..., ChatCompletionClient] = AzureOpenAIChatCompletionClient,
+        cache: Optional[ResponseCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        router: Optional[ModelRouter] = None,
+    ):
+        self.client_factory = client_factory
+        self.cache = cache
+        self.scheduler = scheduler
+        self.router = router
+        self.stats = ClientPoolStats()
+        self._clients: dict[Hashable, ChatCompletionClient] = {}
+        self._wrapped_clients: dict[Hashable, ChatCompletionClient] = {}
+
+    def _get_client(self, model_config: dict[str, Any], client_args: dict[str, Any]) -> ChatCompletionClient:
+        key = (tuple(sorted(model_config.items())), tuple(sorted(client_args.items())))
+        client = self._clients.get(key)
+        if client is not None:
+            self.stats.reused += 1
+            return client
+
+        start = time.perf_counter()
+        if self.scheduler is not None:
+            # The scheduler owns retries, so the SDK's own (unjittered, uncoordinated) retries would only get in the way
+            client = self.client_factory(**model_config, **client_args, max_retries=0)
+        else:
+            client = self.client_factory(**model_config, **client_args)
+        self.stats.setup_seconds += time.perf_counter() - start
+        self.stats.created += 1
+        self._clients[key] = client
+        return client
+
+    def get(
+        self, model_config: dict[str, Any], call_type: Optional[str] = None, **client_args: Any
+    ) -> ChatCompletionClient:
+        """Get the shared client for the given config and call type, creating it on first use."""
+        client = self._get_wrapped_client(model_config, call_type, client_args)
+        if self.router is None:
+            return client
+
+        key = (id(client), call_type, "routed")
+        if key not in self._wrapped_clients:
+            default_model = str(model_config.get("model") or "default")
+            route_config = self.router.route(model_config, call_type)
+            if route_config is None:
+                routed = RoutedChatCompletionClient(client, self.router, str(call_type), default_model, default_model)
+            else:
+                routed = RoutedChatCompletionClient(
+                    self._get_wrapped_client(route_config, call_type, client_args),
+                    self.router,
+                    str(call_type),
+                    str(route_config.get("model")),
+                    default_model,
+                    fallback=client,
+                    response_format=client_args.get("response_format"),
+                )
+            self._wrapped_clients[key] = routed
+        return self._wrapped_clients[key]
+
+    def _get_wrapped_client(
+        self, model_config: dict[str, Any], call_type: Optional[str], client_args: dict[str, Any]
+    ) -> ChatCompletionClient:
+        client = self._get_client(model_config, client_args)
+        key = (id(client), call_type)
+        if key not in self._wrapped_clients:
+            wrapped = client
+            if self.scheduler is not None:
+                wrapped = ScheduledChatCompletionClient(
+                    wrapped, self.scheduler, PRIORITIES.get(call_type, DEFAULT_PRIORITY)
+                )
+            if self.cache is not None:
+                wrapped = CachingChatCompletionClient(
+                    wrapped, self.cache, self._cache_key_prefix(model_config, client_args)
+                )
+            self._wrapped_clients[key] = wrapped
+        return self._wrapped_clients[key]
+
+    @staticmethod
+    def _cache_key_prefix(model_config: dict[str, Any], client_args: dict[str, Any]) -> dict[str, Any]:
+        """The parts of a client's settings that affect its responses, for keying cached responses."""
+        prefix = {"model": model_config.get("model"), "deployment": model_config.get("azure_deployment")}
+        for name, value in client_args.items():
+            if isinstance(value, type) and issubclass(value, BaseModel):
+                # Key on the schema so changing a response model invalidates its recorded responses
+                value = {"name": value.__name__, "schema": value.model_json_schema()}
+            prefix[name] = value
+        return prefix
+
+    async def prewarm(self, model_config: dict[str, Any], client_args: Sequence[dict[str, Any]] = ({},)) -> float:
+        """Create the clients for the given client settings and open a connection from each to the endpoint, so the
+        first model calls skip the client setup and TCP/TLS handshake. Returns how long that took.
+        """
+        start = time.perf_counter()
+        clients = [self._get_client(model_config, args) for args in client_args]
+        await asyncio.gather(*[self._open_connection(client) for client in clients])
+        return time.perf_counter() - start
+
+    @staticmethod
+    async def _open_connection(client: ChatCompletionClient):
+        # The OpenAI SDK client behind autogen's OpenAI clients; other clients (e.g. the stand-in) have none to open
+        sdk_client = getattr(client, "_client", None)
+        if sdk_client is None or not hasattr(sdk_client, "models"):
+            return
+        try:
+            # Any response, even an error, leaves an open connection in the client's pool for the first real call
+            await sdk_client.with_options(max_retries=0, timeout=10).models.list()
+        except Exception:
+            pass
+
+    async def close(self):
+        """Close all pooled clients and their connections."""
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
+        self._wrapped_clients.clear()
+
+
+client_pool = ClientPool()
@@ -0,0 +1,136 @@
+import time
+from typing import Any, AsyncGenerator, Mapping, Optional, Sequence
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,
+    ModelInfo,
+    RequestUsage,
+    SystemMessage,
+)
+from autogen_core.tools import Tool, ToolSchema
+
+from prompts import PrefixCacheEstimator
+from telemetry import Span, TelemetryRecorder
+
+
+class InstrumentedChatCompletionClient(ChatCompletionClient):
+    """Wraps a model client to record a telemetry span for every call: tokens, wall time, time to first token,
+    retries and how much injected memory the prompt carried, tagged with the player and call type.
+
+    `estimated_cached_prompt_tokens` is how many prompt tokens the `prefix_cache` estimator (if given) expects the
+    provider's prompt cache could serve. It's an estimate: the client's usage doesn't report cached tokens.
+    """
+
+    def __init__(
+        self,
+        client: ChatCompletionClient,
+        recorder: TelemetryRecorder,
+        prefix_cache: Optional[PrefixCacheEstimator] = None,
+        **tags: Any,
+    ):
+        self._client = client
+        self._recorder = recorder
+        self._prefix_cache = prefix_cache
+        self._tags = tags
+
+    def _start(self, messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema]) -> tuple[Span, Any]:
+        # Memories are injected as extra system messages after the rules and the player's role
+        memory_chars = sum(len(str(m.content)) for m in messages[2:] if isinstance(m, SystemMessage))
+        span, token = self._recorder.start_call(
+            **self._tags, messages=len(messages), memory_tokens=memory_chars // 4, memory_chars=memory_chars
+        )
+        if self._prefix_cache is not None:
+            span.attributes["estimated_cached_prompt_tokens"] = self._prefix_cache.observe(messages, tools)
+        return span, token
+
+    @staticmethod
+    def _record_result(span: Span, result: CreateResult):
+        span.attributes.update(
+            prompt_tokens=result.usage.prompt_tokens,
+            completion_tokens=result.usage.completion_tokens,
+            cached=result.cached,
+            finish_reason=result.finish_reason,
+        )
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        span, token = self._start(messages, tools)
+        try:
+            result = await self._client.create(
+                messages,
+                tools=tools,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+            )
+            self._record_result(span, result)
+            return result
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            self._recorder.end_call(span, token)
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[str | CreateResult, None]:
+        span, token = self._start(messages, tools)
+        start = time.perf_counter()
+        try:
+            async for chunk in self._client.create_stream(
+                messages,
+                tools=tools,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+            ):
+                if "ttft" not in span.attributes:
+                    span.attributes["ttft"] = time.perf_counter() - start
+                if isinstance(chunk, CreateResult):
+                    self._record_result(span, chunk)
+                yield chunk
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            self._recorder.end_call(span, token)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self._client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
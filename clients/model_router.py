@@ -0,0 +1,260 @@
+import json
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Mapping, Optional, Sequence
+
+from autogen_core import CancellationToken, FunctionCall
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+CALL_TYPES = ["discussion", "reflect", "vote", "seer", "summarise"]
+
+# USD per million (prompt, completion) tokens, for estimating what each route costs
+DEFAULT_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+
+class InvalidResponseError(ValueError):
+    """A model response that doesn't fit the requested structured output or tool schema."""
+
+
+@dataclass
+class RouteStats:
+    """Calls, latency, tokens and estimated cost for one call type on one model."""
+
+    calls: int = 0
+    fallbacks: int = 0
+    seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    # What the same tokens would have cost on the default model
+    default_cost: float = 0.0
+
+
+class ModelRouter:
+    """Decides which model serves each call type and keeps per-route latency and cost stats.
+
+    `routes` maps a call type (discussion, reflect, vote, seer, summarise) to the model config keys to override for
+    it, e.g. `{"vote": {"azure_deployment": "gpt-4o-mini", "model": "gpt-4o-mini"}}`. Call types without a route use
+    the default model config. Routed calls whose structured output or tool call doesn't validate are retried on the
+    default model.
+    """
+
+    def __init__(
+        self,
+        routes: Optional[dict[str, dict[str, Any]]] = None,
+        prices: Optional[dict[str, tuple[float, float]]] = None,
+    ):
+        self.routes = routes or {}
+        self.prices = {**DEFAULT_PRICES, **(prices or {})}
+        self.stats: dict[tuple[str, str], RouteStats] = defaultdict(RouteStats)
+
+    def route(self, model_config: dict[str, Any], call_type: Optional[str]) -> Optional[dict[str, Any]]:
+        """The model config for a call type, or None if it should use the default model config."""
+        overrides = self.routes.get(call_type)
+        if not overrides:
+            return None
+        return {**model_config, **overrides}
+
+    def cost(self, model: str, usage: RequestUsage) -> float:
+        prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+        return (usage.prompt_tokens * prompt_price + usage.completion_tokens * completion_price) / 1_000_000
+
+    def record(
+        self,
+        call_type: str,
+        model: str,
+        default_model: str,
+        seconds: float,
+        usage: RequestUsage,
+        fallback: bool = False,
+    ):
+        stats = self.stats[(call_type, model)]
+        stats.calls += 1
+        stats.fallbacks += fallback
+        stats.seconds += seconds
+        stats.prompt_tokens += usage.prompt_tokens
+        stats.completion_tokens += usage.completion_tokens
+        stats.cost += self.cost(model, usage)
+        stats.default_cost += self.cost(default_model, usage)
+
+    def summary(self) -> str:
+        if not self.stats:
+            return "Model routes: no calls"
+        lines = [
+            "Model routes:",
+            f"  {'call type':<12}{'model':<16}{'calls':>7}{'fallbacks':>11}{'avg (s)':>9}"
+            f"{'prompt':>10}{'completion':>12}{'cost ($)':>10}",
+        ]
+        for (call_type, model), stats in sorted(self.stats.items()):
+            lines.append(
+                f"  {call_type:<12}{model:<16}{stats.calls:>7}{stats.fallbacks:>11}"
+                f"{stats.seconds / stats.calls if stats.calls else 0:>9.2f}{stats.prompt_tokens:>10}"
+                f"{stats.completion_tokens:>12}{stats.cost:>10.4f}"
+            )
+        cost = sum(s.cost for s in self.stats.values())
+        default_cost = sum(s.default_cost for s in self.stats.values())
+        lines.append(
+            f"  Total ${cost:.4f} (${default_cost:.4f} on the default model, ${default_cost - cost:.4f} saved)"
+        )
+        return "\n".join(lines)
+
+
+def validate_result(
+    result: CreateResult, response_format: Optional[type[BaseModel]], tools: Sequence[Tool | ToolSchema]
+):
+    """Raise InvalidResponseError if the result doesn't match the response format or the offered tools."""
+    if isinstance(result.content, str):
+        if response_format is not None:
+            try:
+                response_format.model_validate_json(result.content)
+            except ValidationError as e:
+                raise InvalidResponseError(f"Response doesn't match {response_format.__name__}: {e}") from e
+        return
+
+    tool_names = {t.schema["name"] if isinstance(t, Tool) else t["name"] for t in tools}
+    for call in result.content:
+        if not isinstance(call, FunctionCall) or call.name not in tool_names:
+            raise InvalidResponseError(f"Call to unknown tool {getattr(call, 'name', call)!r}")
+        try:
+            json.loads(call.arguments)
+        except json.JSONDecodeError as e:
+            raise InvalidResponseError(f"Invalid arguments for {call.name}: {e}") from e
+
+
+class RoutedChatCompletionClient(ChatCompletionClient):
+    """Wraps the model client a call type is routed to, falling back to the default model's client when a
+    response fails validation, and records every call against its route.
+
+    Streamed calls (discussion) are passed straight through, as their chunks have already been shown by the time
+    the response could be validated.
+    """
+
+    def __init__(
+        self,
+        client: ChatCompletionClient,
+        router: ModelRouter,
+        call_type: str,
+        model: str,
+        default_model: str,
+        fallback: Optional[ChatCompletionClient] = None,
+        response_format: Optional[type[BaseModel]] = None,
+    ):
+        self._client = client
+        self._router = router
+        self._call_type = call_type
+        self._model = model
+        self._default_model = default_model
+        self._fallback = fallback
+        self._response_format = response_format
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        args = dict(
+            tools=tools,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+        start = time.perf_counter()
+        result = await self._client.create(messages, **args)
+        self._router.record(
+            self._call_type, self._model, self._default_model, time.perf_counter() - start, result.usage
+        )
+        if self._fallback is None:
+            return result
+
+        try:
+            validate_result(result, self._response_format, tools)
+            return result
+        except InvalidResponseError as e:
+            logger.warning(
+                "%s gave an invalid %s response, retrying on %s (%s)",
+                self._model,
+                self._call_type,
+                self._default_model,
+                e,
+            )
+
+        start = time.perf_counter()
+        result = await self._fallback.create(messages, **args)
+        self._router.record(
+            self._call_type,
+            self._default_model,
+            self._default_model,
+            time.perf_counter() - start,
+            result.usage,
+            fallback=True,
+        )
+        return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[str | CreateResult, None]:
+        start = time.perf_counter()
+        async for chunk in self._client.create_stream(
+            messages,
+            tools=tools,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                self._router.record(
+                    self._call_type, self._model, self._default_model, time.perf_counter() - start, chunk.usage
+                )
+            yield chunk
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self._client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
@@ -0,0 +1,289 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Mapping, Optional, Sequence
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+
+from telemetry import count_retry
+
+# Lower runs first: streamed discussion turns are what the user is watching, the rest happens in the background
+PRIORITIES = {
+    "discussion": 0,
+    "seer": 1,
+    "vote": 2,
+    "reflect": 3,
+    "summarise": 3,
+}
+DEFAULT_PRIORITY = 2
+
+
+class TokenBucket:
+    """Allows up to `per_minute` units a minute, refilling continuously, with bursts up to one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.available = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        """How long until `amount` units are available (0 if they are now)."""
+        self._refill()
+        # A request bigger than the whole bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.available) / self.rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self.available -= amount
+
+    def drain(self):
+        """Empty the bucket, e.g. after the service says we're over the limit."""
+        self._refill()
+        self.available = min(self.available, 0)
+
+
+@dataclass
+class WaitStats:
+    requests: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.requests if self.requests else 0.0
+
+
+@dataclass
+class SchedulerMetrics:
+    queue_depth: int = 0
+    in_flight: int = 0
+    throttled: int = 0
+    retries: int = 0
+    waits: dict[int, WaitStats] = field(default_factory=dict)
+
+
+class RequestScheduler:
+    """Coordinates every model call in the process against the deployment's requests/min and tokens/min limits.
+
+    Calls wait in a priority queue and are released in priority order (then arrival order) once both token buckets
+    can cover them. When the service still throttles us (HTTP 429), the buckets are drained and the call is retried
+    after a jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 600,
+        tokens_per_minute: float = 100_000,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.metrics = SchedulerMetrics()
+        self._queue: list[tuple[int, int]] = []
+        self._counter = itertools.count()
+        self._changed: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives belong to one event loop; a process can run several loops one after another
+        loop = asyncio.get_running_loop()
+        if self._changed is None or self._loop is not loop:
+            self._changed = asyncio.Condition()
+            self._loop = loop
+            self._queue.clear()
+        return self._changed
+
+    async def acquire(self, priority: int, estimated_tokens: int):
+        """Wait until it's this call's turn and the rate limits allow it, then reserve its share."""
+        changed = self._condition()
+        entry = (priority, next(self._counter))
+        start = time.monotonic()
+        async with changed:
+            heapq.heappush(self._queue, entry)
+            self.metrics.queue_depth = len(self._queue)
+            # A higher priority call may have just jumped the queue, so let the current head re-check
+            changed.notify_all()
+            try:
+                while True:
+                    if self._queue[0] == entry:
+                        wait = max(self.requests.seconds_until(1), self.tokens.seconds_until(estimated_tokens))
+                        if wait <= 0:
+                            break
+                        timeout = wait
+                    else:
+                        timeout = None
+                    try:
+                        await asyncio.wait_for(changed.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self.metrics.queue_depth = len(self._queue)
+                changed.notify_all()
+
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+
+        waited = time.monotonic() - start
+        stats = self.metrics.waits.setdefault(priority, WaitStats())
+        stats.requests += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+
+    def record_usage(self, estimated_tokens: int, usage: RequestUsage):
+        """Correct the token bucket once the real usage of a call is known."""
+        self.tokens.take(usage.prompt_tokens + usage.completion_tokens - estimated_tokens)
+
+    async def backoff(self, attempt: int):
+        """Called when the service throttles a request: stop everyone sending for a while, then retry."""
+        self.metrics.throttled += 1
+        self.metrics.retries += 1
+        count_retry()
+        self.requests.drain()
+        self.tokens.drain()
+        delay = min(self.max_backoff, self.base_backoff * 2**attempt)
+        await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+    def summary(self) -> str:
+        waits = ", ".join(
+            f"priority {p}: {s.requests} calls, avg wait {s.average_wait:.2f}s, max {s.max_wait:.2f}s"
+            for p, s in sorted(self.metrics.waits.items())
+        )
+        return (
+            f"Request scheduler: queue depth {self.metrics.queue_depth}, in flight {self.metrics.in_flight}, "
+            f"{self.metrics.throttled} throttled, {self.metrics.retries} retries ({waits or 'no calls'})"
+        )
+
+
+def is_throttled(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+class ScheduledChatCompletionClient(ChatCompletionClient):
+    """Wraps a model client so every call goes through the shared RequestScheduler at the given priority."""
+
+    def __init__(self, client: ChatCompletionClient, scheduler: RequestScheduler, priority: int = DEFAULT_PRIORITY):
+        self._client = client
+        self._scheduler = scheduler
+        self._priority = priority
+
+    def _estimate_tokens(self, messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema]) -> int:
+        try:
+            return self._client.count_tokens(messages, tools=tools)
+        except Exception:
+            return sum(len(str(m.content)) for m in messages) // 4
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        estimated_tokens = self._estimate_tokens(messages, tools)
+        for attempt in range(self._scheduler.max_retries + 1):
+            await self._scheduler.acquire(self._priority, estimated_tokens)
+            self._scheduler.metrics.in_flight += 1
+            try:
+                result = await self._client.create(
+                    messages,
+                    tools=tools,
+                    json_output=json_output,
+                    extra_create_args=extra_create_args,
+                    cancellation_token=cancellation_token,
+                )
+            except Exception as e:
+                if not is_throttled(e) or attempt == self._scheduler.max_retries:
+                    raise
+                await self._scheduler.backoff(attempt)
+                continue
+            finally:
+                self._scheduler.metrics.in_flight -= 1
+            self._scheduler.record_usage(estimated_tokens, result.usage)
+            return result
+        raise AssertionError("unreachable")
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[str | CreateResult, None]:
+        estimated_tokens = self._estimate_tokens(messages, tools)
+        for attempt in range(self._scheduler.max_retries + 1):
+            await self._scheduler.acquire(self._priority, estimated_tokens)
+            self._scheduler.metrics.in_flight += 1
+            started = False
+            try:
+                async for chunk in self._client.create_stream(
+                    messages,
+                    tools=tools,
+                    json_output=json_output,
+                    extra_create_args=extra_create_args,
+                    cancellation_token=cancellation_token,
+                ):
+                    started = True
+                    if isinstance(chunk, CreateResult):
+                        self._scheduler.record_usage(estimated_tokens, chunk.usage)
+                    yield chunk
+                return
+            except Exception as e:
+                # Once chunks have reached the caller we can't take them back, so only retry before the first one
+                if started or not is_throttled(e) or attempt == self._scheduler.max_retries:
+                    raise
+                await self._scheduler.backoff(attempt)
+            finally:
+                self._scheduler.metrics.in_flight -= 1
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self._client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncGenerator, Literal, Mapping, Optional, Sequence
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+
+CacheMode = Literal["record", "replay", "fallthrough"]
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when a model call has no recorded response."""
+
+
+class ResponseCache:
+    """A size-bounded, SQLite-backed store of model responses with least-recently-used eviction.
+
+    Modes:
+    - record: always call the model and store (or overwrite) the response
+    - replay: only serve stored responses, raising CacheMissError on a miss (for fully offline runs)
+    - fallthrough: serve stored responses, calling the model and storing the result on a miss
+    """
+
+    def __init__(self, path: str, mode: CacheMode = "fallthrough", max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, size INTEGER, last_used REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._db.commit()
+        self._size = self._total_size()
+
+    def _total_size(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return row[0]
+
+    def put(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            # Overwriting a response frees the space the old one took
+            replaced = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._db.commit()
+            self._size += size - (replaced[0] if replaced else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used responses until the store is back under its size limit."""
+        # Other processes may share the file, so re-read the real size before deciding what to drop
+        self._size = self._total_size()
+        while self._size > self.max_bytes:
+            rows = self._db.execute("SELECT key, size FROM responses ORDER BY last_used LIMIT 100").fetchall()
+            if not rows:
+                break
+            freed = 0
+            for key, size in rows:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                freed += size
+                if self._size - freed <= self.max_bytes:
+                    break
+            self._db.commit()
+            self._size -= freed
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        hit_rate = self.hits / total if total else 0.0
+        return f"Response cache ({self.mode}): {self.hits} hits, {self.misses} misses ({hit_rate:.0%} hit rate)"
+
+    def close(self):
+        self._db.close()
+
+
+class CachingChatCompletionClient(ChatCompletionClient):
+    """Wraps a model client so responses are recorded to and replayed from a ResponseCache.
+
+    The cache key covers everything that determines a response: the model and response format (`key_prefix`),
+    and the full list of messages sent, which already contains the system prompt, injected memories and chat
+    context by the time the agent calls `create`.
+    """
+
+    def __init__(self, client: ChatCompletionClient, cache: ResponseCache, key_prefix: Mapping[str, Any]):
+        self._client = client
+        self._cache = cache
+        self._key_prefix = dict(key_prefix)
+
+    def _key(
+        self,
+        messages: Sequence[LLMMessage],
+        tools: Sequence[Tool | ToolSchema],
+        json_output: Optional[bool | type],
+        extra_create_args: Mapping[str, Any],
+    ) -> str:
+        payload = {
+            **self._key_prefix,
+            "messages": [m.model_dump() for m in messages],
+            "tools": [t.schema if isinstance(t, Tool) else t for t in tools],
+            "json_output": json_output if isinstance(json_output, (bool, type(None))) else repr(json_output),
+            "extra_create_args": dict(extra_create_args),
+        }
+        serialized = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[CreateResult]:
+        if self._cache.mode == "record":
+            return None
+        value = self._cache.get(key)
+        if value is None:
+            if self._cache.mode == "replay":
+                raise CacheMissError(f"No recorded response for model call {key}")
+            return None
+        result = CreateResult.model_validate_json(value)
+        result.cached = True
+        return result
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool | type] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        key = self._key(messages, tools, json_output, extra_create_args)
+        result = self._lookup(key)
+        if result is not None:
+            return result
+
+        result = await self._client.create(
+            messages,
+            tools=tools,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+        self._cache.put(key, result.model_dump_json())
+        return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool | type] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[str | CreateResult, None]:
+        key = self._key(messages, tools, json_output, extra_create_args)
+        result = self._lookup(key)
+        if result is not None:
+            if isinstance(result.content, str) and result.content:
+                yield result.content
+            yield result
+            return
+
+        async for chunk in self._client.create_stream(
+            messages,
+            tools=tools,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                self._cache.put(key, chunk.model_dump_json())
+            yield chunk
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self._client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+from typing import Any, AsyncGenerator, Mapping, Optional, Sequence
+
+from autogen_core import CancellationToken, FunctionCall
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+PLAYER_PATTERN = re.compile(r"Player (\d+)")
+SELF_PATTERN = re.compile(r"You are Player (\d+)")
+ELIMINATED_PATTERN = re.compile(r"Player (\d+) has been eliminated")
+
+
+class StandInChatCompletionClient(ChatCompletionClient):
+    """A deterministic, offline stand-in for the Azure OpenAI client, for benchmarks and headless runs.
+
+    Responses are scripted from the prompt and seeded by a hash of it, so the same game plays out identically on
+    every run: structured votes and seer choices name a living player other than the caller, reflections record a
+    thought with the add_internal_thought tool, and discussion turns say "READY TO VOTE" and hand off to the next
+    player in turn. Latency (to first chunk, and per streamed chunk) and token counts are simulated.
+    """
+
+    latency = 0.0
+    chunk_latency = 0.0
+    completion_tokens = 40
+
+    def __init__(
+        self,
+        response_format: Optional[type[BaseModel]] = None,
+        latency: Optional[float] = None,
+        chunk_latency: Optional[float] = None,
+        completion_tokens: Optional[int] = None,
+        **model_config: Any,
+    ):
+        self._response_format = response_format
+        self._latency = self.latency if latency is None else latency
+        self._chunk_latency = self.chunk_latency if chunk_latency is None else chunk_latency
+        self._completion_tokens = self.completion_tokens if completion_tokens is None else completion_tokens
+        self._total_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self._actual_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    @staticmethod
+    def _text(messages: Sequence[LLMMessage]) -> str:
+        return "\n".join(str(m.content) for m in messages)
+
+    def _rng(self, text: str) -> random.Random:
+        return random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+
+    @staticmethod
+    def _living_others(text: str) -> tuple[int, list[int]]:
+        """The caller's player id and the ids of the other players it has heard of that are still alive."""
+        me = SELF_PATTERN.search(text)
+        me_id = int(me.group(1)) if me else 0
+        mentioned = {int(id) for id in PLAYER_PATTERN.findall(text)}
+        eliminated = {int(id) for id in ELIMINATED_PATTERN.findall(text)}
+        others = sorted(mentioned - eliminated - {me_id}) or sorted(mentioned - {me_id}) or [me_id]
+        return me_id, others
+
+    def _respond(self, messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema]) -> CreateResult:
+        text = self._text(messages)
+        rng = self._rng(text)
+        me, others = self._living_others(text)
+        tool_names = [t.schema["name"] if isinstance(t, Tool) else t["name"] for t in tools]
+        prompt_tokens = self.count_tokens(messages)
+        usage = RequestUsage(prompt_tokens=prompt_tokens, completion_tokens=self._completion_tokens)
+
+        if self._response_format is not None:
+            fields = list(self._response_format.model_fields)
+            target_field = next(f for f in fields if f != "reason")
+            target = rng.choice(others)
+            content = json.dumps({"reason": f"Player {target} has been acting suspiciously.", target_field: target})
+            return CreateResult(finish_reason="stop", content=content, usage=usage, cached=False)
+
+        if "add_internal_thought" in tool_names:
+            arguments = {"content": f"I should keep an eye on Player {rng.choice(others)}."}
+            call = FunctionCall(
+                id=f"call_{rng.getrandbits(32)}", name="add_internal_thought", arguments=json.dumps(arguments)
+            )
+            return CreateResult(finish_reason="function_calls", content=[call], usage=usage, cached=False)
+
+        transfers = sorted(
+            (int(name.rsplit("_", 1)[1]), name) for name in tool_names if name.startswith("transfer_to_player_")
+        )
+        thought = f"I'm not sure about Player {rng.choice(others)} yet. READY TO VOTE"
+        if transfers:
+            # Hand off round the table in order so every player gets a turn
+            _, next_player = next(((id, name) for id, name in transfers if id > me), transfers[0])
+            call = FunctionCall(id=f"call_{rng.getrandbits(32)}", name=next_player, arguments="{}")
+            return CreateResult(
+                finish_reason="function_calls", content=[call], usage=usage, cached=False, thought=thought
+            )
+
+        return CreateResult(finish_reason="stop", content=thought, usage=usage, cached=False)
+
+    def _add_usage(self, usage: RequestUsage):
+        self._actual_usage = RequestUsage(
+            prompt_tokens=self._actual_usage.prompt_tokens + usage.prompt_tokens,
+            completion_tokens=self._actual_usage.completion_tokens + usage.completion_tokens,
+        )
+        self._total_usage = self._actual_usage
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        await asyncio.sleep(self._latency)
+        result = self._respond(messages, tools)
+        self._add_usage(result.usage)
+        return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[str | CreateResult, None]:
+        await asyncio.sleep(self._latency)
+        result = self._respond(messages, tools)
+        streamed = result.content if isinstance(result.content, str) else result.thought or ""
+        for i, word in enumerate(streamed.split(" ")):
+            if i and self._chunk_latency:
+                await asyncio.sleep(self._chunk_latency)
+            yield word if i == 0 else f" {word}"
+        self._add_usage(result.usage)
+        yield result
+
+    async def close(self) -> None:
+        pass
+
+    def actual_usage(self) -> RequestUsage:
+        return self._actual_usage
+
+    def total_usage(self) -> RequestUsage:
+        return self._total_usage
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return len(self._text(messages)) // 4 + 1
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return 128_000 - self.count_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return ModelCapabilities(vision=False, function_calling=True, json_output=True)
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return ModelInfo(vision=False, function_calling=True, json_output=True, family="unknown")
@@ -0,0 +1,105 @@
+import os
+import time
+
+from dotenv import load_dotenv
+
+from clients.model_router import CALL_TYPES, ModelRouter
+from clients.request_scheduler import RequestScheduler
+from clients.response_cache import ResponseCache
+
+
+def load_model_config() -> dict[str, str]:
+    """Build the Azure OpenAI model config from the environment (.env)."""
+    # azure.identity is slow to import, and only needed when playing against Azure OpenAI
+    from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+
+    load_dotenv()
+    token_provider = get_bearer_token_provider(DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
+
+    return {
+        "azure_deployment": os.getenv("MODEL_DEPLOYMENT"),
+        "model": os.getenv("MODEL_NAME"),
+        "api_version": "2024-10-21",
+        "azure_endpoint": os.getenv("AZURE_OPENAI_ENDPOINT"),
+        "azure_ad_token_provider": token_provider,
+    }
+
+
+def prewarm_credential(model_config: dict) -> float:
+    """Fetch the model config's Entra ID token now, so the first model call doesn't wait for it, and return how
+    long that took.
+
+    The token provider caches the token until it's about to expire, so every client sharing the config reuses it.
+    This blocks, so run it in a thread alongside other startup work.
+    """
+    token_provider = model_config.get("azure_ad_token_provider")
+    if token_provider is None:
+        return 0.0
+    start = time.perf_counter()
+    token_provider()
+    return time.perf_counter() - start
+
+
+def load_response_cache() -> ResponseCache | None:
+    """Open the model response cache configured in the environment, if any.
+
+    MODEL_CACHE_PATH: SQLite file to record responses to / replay them from (no caching if unset)
+    MODEL_CACHE_MODE: record, replay or fallthrough (default)
+    MODEL_CACHE_MAX_MB: size limit before least recently used responses are evicted (default 512)
+    """
+    load_dotenv()
+    path = os.getenv("MODEL_CACHE_PATH")
+    if not path:
+        return None
+    return ResponseCache(
+        path,
+        mode=os.getenv("MODEL_CACHE_MODE", "fallthrough"),
+        max_bytes=int(os.getenv("MODEL_CACHE_MAX_MB", "512")) * 1024 * 1024,
+    )
+
+
+def load_request_scheduler() -> RequestScheduler | None:
+    """Create the model request scheduler for the deployment's rate limits configured in the environment, if any.
+
+    MODEL_REQUESTS_PER_MINUTE / MODEL_TOKENS_PER_MINUTE: the deployment's quota (no scheduling if neither is set)
+    """
+    load_dotenv()
+    requests_per_minute = os.getenv("MODEL_REQUESTS_PER_MINUTE")
+    tokens_per_minute = os.getenv("MODEL_TOKENS_PER_MINUTE")
+    if not requests_per_minute and not tokens_per_minute:
+        return None
+    return RequestScheduler(
+        requests_per_minute=float(requests_per_minute or 600),
+        tokens_per_minute=float(tokens_per_minute or 100_000),
+    )
+
+
+def parse_model_prices(value: str) -> dict[str, tuple[float, float]]:
+    """Parse "model=prompt/completion,..." prices (USD per million tokens)."""
+    prices = {}
+    for item in filter(None, (i.strip() for i in value.split(","))):
+        model, price = item.split("=")
+        prompt_price, completion_price = price.split("/")
+        prices[model.strip()] = (float(prompt_price), float(completion_price))
+    return prices
+
+
+def load_model_router() -> ModelRouter | None:
+    """Create the model router for the per call type deployments configured in the environment, if any.
+
+    MODEL_DEPLOYMENT_<CALL TYPE>: deployment to serve that call type (DISCUSSION, REFLECT, VOTE, SEER, SUMMARISE)
+    MODEL_NAME_<CALL TYPE>: the model behind that deployment (defaults to the deployment name)
+    MODEL_PRICES: prices to estimate route costs with, as "model=prompt/completion,..." USD per million tokens
+    """
+    load_dotenv()
+    routes = {}
+    for call_type in CALL_TYPES:
+        deployment = os.getenv(f"MODEL_DEPLOYMENT_{call_type.upper()}")
+        if deployment:
+            routes[call_type] = {
+                "azure_deployment": deployment,
+                "model": os.getenv(f"MODEL_NAME_{call_type.upper()}", deployment),
+            }
+    if not routes:
+        return None
+    return ModelRouter(routes, parse_model_prices(os.getenv("MODEL_PRICES", "")))
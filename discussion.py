@@ -0,0 +1,147 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional, Sequence
+
+from autogen_agentchat.base import TerminationCondition
+from autogen_agentchat.conditions import TimeoutTermination
+from autogen_agentchat.messages import ChatMessage
+from autogen_agentchat.teams import Swarm
+from autogen_core.models import AssistantMessage, LLMMessage
+
+from memory.round_window_memory import summarise_extractive
+from prompts import Transcript
+from roles._role import Role
+from terminations.max_turns_per_source_termination import MaxTurnsPerSourceTermination
+from terminations.text_mention_from_all_termination import TextMentionFromAllTermination
+from terminations.token_budget_termination import TokenBudgetTermination
+from ui.base_message_handler import BaseMessageHandler
+
+# "swarm": everyone in one Swarm, "breakout": parallel groups and a plenary, "auto": breakout for large tables only
+DiscussionMode = Literal["swarm", "breakout", "auto"]
+
+
+@dataclass
+class DiscussionLimits:
+    """When a discussion stops: whichever comes first of the timeout, a quorum of players saying "READY TO VOTE",
+    one player taking too many turns, or the discussion's model calls using up a token budget.
+    """
+
+    timeout: float = 60
+    # Fraction of the players that must be ready to vote (1 = all of them)
+    ready_quorum: float = 1.0
+    # Turns any one player may take before the discussion ends (for everyone)
+    max_turns_per_player: Optional[int] = None
+    max_tokens: Optional[int] = None
+
+    def termination(
+        self, agent_names: set[str], on_ready: Optional[Callable[[str], None]] = None
+    ) -> TerminationCondition:
+        """The discussion's termination condition, calling `on_ready` with each agent that says it's ready to vote."""
+        condition = TimeoutTermination(self.timeout) | TextMentionFromAllTermination(
+            agent_names, "READY TO VOTE", quorum=self.ready_quorum, on_ready=on_ready
+        )
+        if self.max_turns_per_player:
+            condition |= MaxTurnsPerSourceTermination(self.max_turns_per_player, agent_names)
+        if self.max_tokens:
+            condition |= TokenBudgetTermination(self.max_tokens)
+        return condition
+
+
+def split_into_groups(player_ids: list[int], group_size: int, rng: random.Random) -> list[list[int]]:
+    """Shuffle the players into as few groups of at most `group_size` as possible, of near-equal sizes."""
+    ids = list(player_ids)
+    rng.shuffle(ids)
+    n_groups = max(1, -(-len(ids) // max(1, group_size)))
+    return [sorted(ids[i::n_groups]) for i in range(n_groups)]
+
+
+def player_messages(messages: Sequence) -> list[LLMMessage]:
+    """What the players said in a team's messages, as context for their reflections and votes."""
+    return [
+        AssistantMessage(content=m.content, source=m.source)
+        for m in messages
+        if m.type == "ThoughtEvent" or m.type == "TextMessage"
+    ]
+
+
+class BreakoutDiscussion:
+    """A discussion for large tables: players talk in concurrent breakout groups, then hear a short plenary.
+
+    In a single Swarm only one player speaks at a time, so with many players a phase runs into its timeout before
+    most have spoken. Here each group runs its own Swarm in parallel. Each group's talk is then summarised
+    (extractively, without a model call) and one representative per group gives a closing statement to everyone,
+    all at the same time. The discussion's wall time depends on the group size rather than the number of players.
+    """
+
+    def __init__(
+        self,
+        message_handler: BaseMessageHandler,
+        group_size: int = 5,
+        limits: Optional[DiscussionLimits] = None,
+        summary_chars_per_message: int = 120,
+    ):
+        self.message_handler = message_handler
+        self.group_size = group_size
+        self.limits = limits or DiscussionLimits()
+        self.summary_chars_per_message = summary_chars_per_message
+        # Why each group's discussion stopped, in the last run
+        self.stop_reasons: list[str] = []
+        # Groups send their transcripts whole, one at a time, so they don't interleave in the UI
+        self._ui_lock = asyncio.Lock()
+
+    async def run_group(self, task: ChatMessage | str, group: list[Role]) -> list[LLMMessage]:
+        """Run one group's discussion and return what its players said."""
+        ids = [p.id for p in group]
+        if len(group) == 1:
+            agents = [await group[0].get_agent_for_discussion(ids)]
+            result = await agents[0].run(task=task)
+        else:
+            agents = [await p.get_agent_for_discussion(ids) for p in group]
+            team = Swarm(agents, termination_condition=self.limits.termination(set([a.name for a in agents])))
+            result = await team.run(task=task)
+            self.stop_reasons.append(result.stop_reason or "")
+
+        messages = player_messages(result.messages)
+        async with self._ui_lock:
+            await self.message_handler.send_message(f"HOST: Breakout group of Players {', '.join(map(str, ids))}")
+            for message in messages:
+                await self.message_handler.send_message(message.content, message.source)
+        return messages
+
+    async def run(self, task: ChatMessage | str, participants: list[Role], rng: random.Random) -> dict[int, Transcript]:
+        """Run the discussion, returning each participant's view of it: their own group's talk and the plenary.
+
+        Players in the same group share the same transcript.
+        """
+        by_id = {p.id: p for p in participants}
+        groups = [[by_id[id] for id in ids] for ids in split_into_groups(list(by_id), self.group_size, rng)]
+        self.stop_reasons = []
+        transcripts = await asyncio.gather(*[self.run_group(task, group) for group in groups])
+
+        summaries = []
+        for group, transcript in zip(groups, transcripts):
+            summary = await summarise_extractive(
+                0, [f"{m.source}: {m.content}" for m in transcript], self.summary_chars_per_message
+            )
+            summaries.append(f"Group of Players {', '.join(str(p.id) for p in group)}: {summary or 'nothing was said'}")
+        summary_message = AssistantMessage(
+            content="HOST: Summary of the breakout groups. " + " | ".join(summaries), source="host"
+        )
+        await self.message_handler.send_message(summary_message.content)
+
+        # One representative per group speaks to everyone, concurrently
+        representatives = [rng.choice(group) for group in groups]
+        plenary_task = (
+            f"{summary_message.content}\nHOST: You are your group's representative in the plenary. In a few "
+            "sentences, tell everyone what your group concluded and who you suspect."
+        )
+        results = await asyncio.gather(
+            *[(await p.get_agent_for_discussion([p.id])).run(task=plenary_task) for p in representatives]
+        )
+        plenary = [m for result in results for m in player_messages(result.messages)]
+        for message in plenary:
+            await self.message_handler.send_message(message.content, message.source)
+
+        views = [Transcript(transcript + [summary_message] + plenary) for transcript in transcripts]
+        return {p.id: view for group, view in zip(groups, views) for p in group}
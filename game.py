@@ -1,99 +1,333 @@
+import asyncio
+import logging
+import os
 import random
-from typing import Sequence
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Sequence, TypeVar
 
-from autogen_agentchat.conditions import TimeoutTermination
 from autogen_agentchat.messages import ChatMessage
 from autogen_agentchat.teams import Swarm
-from autogen_core.model_context import UnboundedChatCompletionContext
 from autogen_core.models import AssistantMessage
 
+from checkpoint import GameCheckpointer, rng_state_from_json
+from clients.client_pool import client_pool
+from discussion import BreakoutDiscussion, DiscussionLimits, DiscussionMode, player_messages
+from game_log import ELIMINATION, VOTE, GameEvents, GameLog
 from models.agent_vote_response import AgentVoteResponse
+from prompts import Transcript
+from roles._night_action import NightAction
 from roles._role import Role
-from roles.seer import Seer
-from terminations.text_mention_from_all_termination import TextMentionFromAllTermination
-from ui.message_handler import MessageHandler
+from speculative_votes import SpeculationStats, SpeculativeVotes
+from telemetry import Span, recorder, set_call_tags
+from ui.base_message_handler import BaseMessageHandler
 from utils import count_votes
 
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EliminationVote:
+    """A discussion's votes, decided but not yet applied to the game (see `WerewolfGame.apply_vote`)."""
+
+    phase: str
+    participants: list[Role]
+    # In participant order, None for a participant who abstained
+    votes: list[AgentVoteResponse | None]
+    # The players who could be eliminated, one of whom is drawn at random if every participant abstained
+    targets: list[int]
+    span: Span
+    speculation: SpeculationStats | None = None
+
 
 class WerewolfGame:
 
-    def __init__(self, model_config: dict[str, str], message_handler: MessageHandler, roles: list[Role]):
+    def __init__(
+        self,
+        model_config: dict[str, str],
+        message_handler: BaseMessageHandler,
+        roles: list[Role],
+        max_concurrency: int = 8,
+        action_timeout: float | None = 60,
+        seed: int | None = None,
+        checkpointer: GameCheckpointer | None = None,
+        game_id: str | None = None,
+        discussion: DiscussionMode = "auto",
+        breakout_group_size: int = 5,
+        discussion_limits: DiscussionLimits | None = None,
+        game_log: GameLog | None = None,
+        speculative_votes: bool = False,
+        memory_dir: str | None = None,
+    ):
+        self.game_id = game_id or uuid.uuid4().hex[:12]
         self.model_config = model_config
         self.message_handler = message_handler
+        # Limit on how many players reflect/vote at the same time (1 = one after the other)
+        self.max_concurrency = max_concurrency
+        # Seconds a single player's reflection or vote may take before we fall back
+        self.action_timeout = action_timeout
+        self.checkpointer = checkpointer
+        # Where the game's outcome, votes and eliminations are written when it ends (if anywhere)
+        self.game_log = game_log
+        self.events = GameEvents()
+        self.seed = seed
+        # How day discussions are run, see `uses_breakout`
+        self.discussion = discussion
+        self.discussion_limits = discussion_limits or DiscussionLimits()
+        self.breakout = BreakoutDiscussion(message_handler, breakout_group_size, self.discussion_limits)
+        # Whether to start players' votes as soon as they're ready to vote, while a (single Swarm) discussion goes on
+        self.speculative_votes = speculative_votes
+        self.speculation_stats = SpeculationStats()
+        # Where players' memories are persisted, in a directory per game (vector memory only)
+        self.memory_dir = memory_dir
+        # Seeded source of randomness for the role shuffle and tie-breaks so games can be replayed
+        self.rng = random.Random(seed)
         self.round = 1
+        # The phase the game will run next: "setup" (before the welcome), "day" or "night"
+        self.next_phase = "setup"
         self.game_over = False
+        self.winner: str | None = None
+        self.eliminated_players: list[int] = []
         self.votes: list[AgentVoteResponse] = []
+        self.voters: list[int] = []
 
-        random.shuffle(roles)
-        self.players = [r(model_config, message_handler, i + 1) for i, r in enumerate(roles)]
+        self.rng.shuffle(roles)
+        if roles and memory_dir is not None:
+            # A new game starts its players' memories afresh (a resumed one reopens them in `resume`)
+            shutil.rmtree(os.path.join(memory_dir, self.game_id), ignore_errors=True)
+        self.players = [r(model_config, message_handler, i + 1, self.memory_path(i + 1)) for i, r in enumerate(roles)]
+        self.dealt_roles = {p.id: p.role for p in self.players}
 
         print("The players and their roles are:")
         for player in self.players:
             print(f"Player {player.id}: {player.role}")
 
+    @classmethod
+    async def resume(
+        cls,
+        model_config: dict[str, str],
+        message_handler: BaseMessageHandler,
+        checkpointer: GameCheckpointer,
+        **kwargs,
+    ) -> "WerewolfGame":
+        """Recreate a game from its checkpoint, ready to continue from the next phase without any model calls."""
+        state = checkpointer.load()
+        game = cls(model_config, message_handler, [], checkpointer=checkpointer, **kwargs)
+        game.game_id = state["game_id"]
+        game.players = await checkpointer.restore_players(state, model_config, message_handler, game.memory_path)
+        game.round = state["round"]
+        game.next_phase = state["next_phase"]
+        game.game_over = state["game_over"]
+        game.winner = state["winner"]
+        game.eliminated_players = state["eliminated_players"]
+        game.dealt_roles = {int(id): role for id, role in state["dealt_roles"].items()}
+        game.rng.setstate(rng_state_from_json(state["rng_state"]))
+        game.seed = state.get("seed")
+        game.events.rows = [tuple(row) for row in state["events"]]
+        logger.info(
+            "Resumed game %s at round %d (%s phase) with players: %s",
+            game.game_id,
+            game.round,
+            game.next_phase,
+            [p.id for p in game.players],
+        )
+        return game
+
+    def memory_path(self, player_id: int) -> str | None:
+        """Prefix of the files a player's memories are persisted to, if the game persists them."""
+        if self.memory_dir is None:
+            return None
+        os.makedirs(os.path.join(self.memory_dir, self.game_id), exist_ok=True)
+        return os.path.join(self.memory_dir, self.game_id, f"player_{player_id}")
+
     async def announce_event_to_all(self, message: str):
         """Announce an event to all players."""
         await self.message_handler.send_message(message)
         for player in self.players:
             await player.remember_event(message, self.round)
 
+    def uses_breakout(self, participants: list[Role]) -> bool:
+        """Whether to discuss in parallel breakout groups rather than a single Swarm.
+
+        In "auto" mode, breakout groups are only used once there are more than two groups' worth of participants.
+        """
+        if self.discussion == "auto":
+            return len(participants) > 2 * self.breakout.group_size
+        return self.discussion == "breakout"
+
+    async def run_for_participants(
+        self,
+        participants: list[Role],
+        action: Callable[[Role], Awaitable[T]],
+        fallback: Callable[[Role, Exception], T],
+    ) -> list[T]:
+        """Run an action for every participant concurrently, returning results in participant order.
+
+        The actions run side by side, so each must only use its own participant's agents (whose model contexts are
+        separate) and shared state that isn't changed, such as a discussion's transcript. A participant whose action
+        fails or times out gets the result of `fallback` instead, and the failure is reported through the message
+        handler, so one bad model call can't take down the whole phase.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def run_one(p: Role) -> T:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(action(p), timeout=self.action_timeout)
+                except Exception as e:
+                    await self.message_handler.send_message(
+                        f"Player {p.id} failed to complete their action ({type(e).__name__}: {e})"
+                    )
+                    return fallback(p, e)
+
+        return await asyncio.gather(*[run_one(p) for p in participants])
+
     async def run_phase(
         self,
         task: ChatMessage | str | Sequence[ChatMessage],
         participants: list[Role],
+        phase: str = "day",
     ):
         """Run a phase of the game with the given task and participants."""
-        self.votes.clear()
+        set_call_tags(game=self.game_id, round=self.round, phase=phase)
+        vote = await self.decide_elimination(task, participants, phase)
+        await self.eliminate(await self.apply_vote(vote), phase)
 
-        async def announce_event_to_participants(message: str):
-            """Add messages to only the current participants' event memories"""
-            await self.message_handler.send_message(message)
-            for p in participants:
-                await p.remember_event(message, self.round)
+    async def decide_elimination(
+        self,
+        task: ChatMessage | str | Sequence[ChatMessage],
+        participants: list[Role],
+        phase: str = "day",
+        targets: list[int] | None = None,
+    ) -> EliminationVote:
+        """Have the participants discuss the task and vote, without applying the votes to the game.
 
-        agents = [p.get_agent_for_discussion([p.id for p in participants]) for p in participants]
+        `targets` are the players who could be eliminated (by default, any living player). Nothing shared is changed here (the votes, the game's events, other players' memories), so eliminations can
+        be decided alongside other night actions; the participants only record their own reflections.
+        """
+        span = recorder.start_span("phase", participants=len(participants))
 
-        if len(agents) > 1:
-            team = Swarm(
-                agents,
-                termination_condition=TimeoutTermination(60)
-                | TextMentionFromAllTermination(set([a.name for a in agents]), "READY TO VOTE"),
-            )
+        # What each participant heard of the discussion, shared (not copied) between participants who heard the same
+        speculation = None
+        if len(participants) > 1 and self.uses_breakout(participants):
+            transcripts = await self.breakout.run(task, participants, self.rng)
+            stop_reasons = self.breakout.stop_reasons
+        elif len(participants) > 1:
+            agents = [await p.get_agent_for_discussion([p.id for p in participants]) for p in participants]
+            names = set([a.name for a in agents])
+            if self.speculative_votes:
+                speculation = SpeculativeVotes(participants)
+                termination = self.discussion_limits.termination(names, on_ready=speculation.ready) | speculation
+            else:
+                termination = self.discussion_limits.termination(names)
+            team = Swarm(agents, termination_condition=termination)
             # Run the agent(s) discussion and stream the messages to the console.
             task_result = await self.message_handler.send_message_stream(team.run_stream(task=task))
-
-            # Ask each particpant to individually reflect on the chat history of the round and come up with suspicions/strategy, store to memory
-            player_messages = [m for m in task_result.messages if m.type == "ThoughtEvent" or m.type == "TextMessage"]
-            discussion_context = UnboundedChatCompletionContext(
-                initial_messages=[AssistantMessage(content=m.content, source=m.source) for m in player_messages]
-            )
-            for p in participants:
-                await p.reflect_on_discussion(discussion_context)
+            stop_reasons = [task_result.stop_reason or ""]
+            transcript = Transcript(player_messages(task_result.messages))
+            transcripts = {p.id: transcript for p in participants}
         else:
             # If only one agent, run it directly
-            task_result = await self.message_handler.send_message_stream(agents[0].run_stream(task=task))
-            discussion_context = UnboundedChatCompletionContext(
-                initial_messages=[
+            agent = await participants[0].get_agent_for_discussion([participants[0].id])
+            task_result = await self.message_handler.send_message_stream(agent.run_stream(task=task))
+            transcripts = {
+                participants[0].id: Transcript(
                     AssistantMessage(content=m.content, source=m.source)
                     for m in task_result.messages
                     if m.type == "TextMessage"
-                ]
+                )
+            }
+            stop_reasons = []
+
+        if len(participants) > 1:
+            # Ask each particpant to individually reflect on the chat history of the round and come up with suspicions/strategy, store to memory
+            await self.run_for_participants(
+                participants,
+                lambda p: p.reflect_on_discussion(transcripts[p.id]),
+                lambda p, e: None,
             )
 
+        for reason in stop_reasons:
+            logger.info("Discussion stopped: %s", reason)
+
+        # Let the UI catch up on the discussion's batched updates before the vote
+        await self.message_handler.flush()
+
         # Hold a vote for elimination
-        await announce_event_to_participants("HOST: It's time for the participant(s) to make their vote...")
-        for p in participants:
-            vote = await p.make_vote(discussion_context)
-            self.votes.append(vote)
-
-        # Announce the votes (don't do this as they come in above as it may influence the other players)
-        for i, vote in enumerate(self.votes):
-            await announce_event_to_participants(
-                f"Player {participants[i].id} voted to eliminate Player {vote.player_to_eliminate} because: {vote.reason}"
+        await self.message_handler.send_message("HOST: It's time for the participant(s) to make their vote...")
+
+        async def vote(p: Role) -> AgentVoteResponse | None:
+            if speculation is not None:
+                return await speculation.vote(p, transcripts[p.id])
+            return await p.make_vote(transcripts[p.id])
+
+        try:
+            # A player whose vote can't be collected abstains
+            votes = await self.run_for_participants(participants, vote, lambda p, e: None)
+        finally:
+            if speculation is not None:
+                await speculation.cancel()
+
+        span.attributes.update(votes=len(votes), stop_reasons=stop_reasons)
+        span.end = time.time()
+        return EliminationVote(
+            phase=phase,
+            participants=participants,
+            votes=votes,
+            targets=targets if targets is not None else [p.id for p in self.players],
+            span=span,
+            speculation=speculation.stats if speculation is not None else None,
+        )
+
+    async def apply_vote(self, vote: EliminationVote) -> int:
+        """Record and announce a decided vote to its participants, returning the player they voted to eliminate.
+
+        If every participant abstained, one of the vote's targets is drawn at random so the game can go on.
+        """
+        cast = [(p, response) for p, response in zip(vote.participants, vote.votes) if response is not None]
+        self.voters = [p.id for p, _ in cast]
+        self.votes = [response for _, response in cast]
+        if vote.speculation is not None:
+            self.speculation_stats.add(vote.speculation)
+            vote.span.attributes.update(
+                speculative_votes_kept=vote.speculation.kept,
+                speculative_votes_redone=vote.speculation.redone,
+                speculative_votes_regenerated=vote.speculation.regenerated,
             )
 
-        # Eliminate the player
-        eliminated_player = count_votes([vote.player_to_eliminate for vote in self.votes])
+        # Announce the votes (not as they come in, as it may influence the other players), to the participants only
+        for voter, response in zip(vote.participants, vote.votes):
+            if response is None:
+                message = f"Player {voter.id} abstained, as their vote couldn't be collected."
+            else:
+                self.events.record(self.round, vote.phase, VOTE, voter.id, response.player_to_eliminate)
+                message = (
+                    f"Player {voter.id} voted to eliminate Player {response.player_to_eliminate} because: "
+                    f"{response.reason}"
+                )
+            await self.message_handler.send_message(message)
+            for p in vote.participants:
+                await p.remember_event(message, self.round)
+
+        if self.votes:
+            eliminated_player = count_votes([response.player_to_eliminate for response in self.votes], self.rng)
+        else:
+            eliminated_player = self.rng.choice(vote.targets)
+            message = f"HOST: No votes could be collected, so Player {eliminated_player} was drawn at random."
+            await self.message_handler.send_message(message)
+            for p in vote.participants:
+                await p.remember_event(message, self.round)
+        vote.span.attributes.update(eliminated=eliminated_player, abstained=len(vote.votes) - len(self.votes))
+        return eliminated_player
+
+    async def eliminate(self, eliminated_player: int, phase: str = "day"):
+        """Remove a player from the game, announce it and check whether the game is over."""
+        self.eliminated_players.append(eliminated_player)
+        self.events.record(self.round, phase, ELIMINATION, 0, eliminated_player)
         self.players = [player for player in self.players if player.id != eliminated_player]
         # TODO: differentation between werewolf and villager elimination
         await self.announce_event_to_all(f"HOST: Player {eliminated_player} has been eliminated.")
@@ -103,50 +337,110 @@ class WerewolfGame:
 
         if len(werewolves) == 0:
             await self.message_handler.send_message("No werewolves remain. The villagers have won!")
+            self.winner = "villagers"
             self.game_over = True
         elif len(self.players) == 2:
             await self.message_handler.send_message(
                 "Only 2 players remain, and there is still a werewolf. The werewolf team has won!"
             )
+            self.winner = "werewolves"
             self.game_over = True
         elif len(werewolves) == len(self.players):
             await self.message_handler.send_message("No villagers remain. The werewolf team has won!")
+            self.winner = "werewolves"
             self.game_over = True
 
-        # TODO: save the game state (agent memory, team, round number, current players etc.) to a file
+        await self.message_handler.flush()
 
-    async def run(self):
-        """Run the game until end condition."""
-        await self.announce_event_to_all(
-            f"HOST: Welcome, villagers... and werewolves! I've dealt out the following roles randomly: {', '.join([p.role for p in self.players])}. Now, let's begin!"
+    async def run_night_actions(self):
+        """Run every living role's night action concurrently, then resolve them in order.
+
+        Each role declares its action (e.g. the werewolves' kill, the seer's vision) as its `night_action`. The
+        actions only decide concurrently: their outcomes are applied one at a time by increasing `order`, and any
+        left once the game is over are dropped.
+        """
+        set_call_tags(game=self.game_id, round=self.round, phase="night")
+        span = recorder.start_span("night_actions")
+        players_by_action: dict[type[NightAction], list[Role]] = {}
+        for player in self.players:
+            if player.night_action is not None:
+                players_by_action.setdefault(player.night_action, []).append(player)
+        actions = sorted(
+            [(action(), players) for action, players in players_by_action.items()], key=lambda a: a[0].order
         )
-        while not self.game_over:
-            # Run day phase
-            await self.message_handler.send_message("=== DAY PHASE ===")
-            await self.run_phase(
-                f"HOST: It's Round {self.round}. The day phase has begun. Player {', Player '.join([str(p.id) for p in self.players])}... start your discussions!",
-                self.players,
-            )
 
+        # Let every action finish deciding before one's failure is raised, so none is left running without an owner
+        decisions = await asyncio.gather(
+            *[action.decide(self, players) for action, players in actions], return_exceptions=True
+        )
+        for decision in decisions:
+            if isinstance(decision, BaseException):
+                raise decision
+        for (action, players), decision in zip(actions, decisions):
             if self.game_over:
                 break
+            await action.resolve(self, players, decision)
+
+        span.attributes.update(actions=[type(action).__name__ for action, _ in actions])
+        span.end = time.time()
+
+    async def checkpoint_phase(self):
+        """Record the phase that just finished, if checkpointing is enabled."""
+        if self.checkpointer is not None:
+            await self.checkpointer.save_phase(self, self.eliminated_players[-1])
+
+    async def run(self):
+        """Run the game until end condition."""
+        if self.game_over:
+            # Resumed after it finished: it's already been logged and summarised
+            return
+
+        if self.next_phase == "setup":
+            if self.checkpointer is not None:
+                self.checkpointer.save_snapshot(self)
+            await self.announce_event_to_all(
+                f"HOST: Welcome, villagers... and werewolves! I've dealt out the following roles randomly: {', '.join([p.role for p in self.players])}. Now, let's begin!"
+            )
+            self.next_phase = "day"
+
+        while not self.game_over:
+            for player in self.players:
+                player.start_round(self.round)
+            if self.next_phase == "day":
+                # Run day phase
+                await self.message_handler.send_message("=== DAY PHASE ===")
+                await self.run_phase(
+                    f"HOST: It's Round {self.round}. The day phase has begun. Player {', Player '.join([str(p.id) for p in self.players])}... start your discussions!",
+                    self.players,
+                )
+                self.next_phase = "night"
+                await self.checkpoint_phase()
+
+                if self.game_over:
+                    break
 
             # Run night phase
-            # TODO: split methods into a run_discussion, run_vote
             await self.message_handler.send_message("=== NIGHT PHASE ===")
-            await self.message_handler.send_message("*** Werewolves, wake up... ***")
-            werewolves = [p for p in self.players if p.role == "werewolf"]
-            task = f"HOST: The night phase has now begun. The villagers are asleep. Werewolves, wake up. You must now decide which villager to kill! The villagers remaining are Player {', Player '.join([str(v.id) for v in self.players if v.role != "werewolf"])}."
-            if len(werewolves) > 1:
-                task += f" The werewolves remaining are Player {', Player '.join([str(w.id) for w in werewolves])}). You may now discuss your strategy with each other."
-            else:
-                task += " You are the only remaining werewolf. You may now reflect on your strategy and consider which players might be a threat to you."
-            await self.run_phase(task, werewolves)
+            await self.run_night_actions()
 
-            # TODO: if we add more special actions, implement this generically so we can simply iterate
-            seer = next((p for p in self.players if isinstance(p, Seer)), None)
-            if seer:
-                await self.message_handler.send_message("*** Seer, wake up... ***")
-                await seer.see_another_player(self.players)
+            if not self.game_over:
+                # A game that ended at night ended in this round, which is the number of rounds it's logged with
+                self.round += 1
+            self.next_phase = "day"
+            await self.checkpoint_phase()
 
-            self.round += 1
+        if self.game_log is not None:
+            self.game_log.write(self.dealt_roles, self.events, self.round, self.winner, self.seed)
+        summary = [recorder.finish_game(self.game_id), self.message_handler.stream_summary()]
+        if self.speculative_votes:
+            summary.append(self.speculation_stats.summary())
+        # The client pool (and its cache, scheduler and router) is shared by every game played in this process
+        summary.append("Totals for all games played in this process so far:")
+        summary.append(f"  {client_pool.stats.summary()}")
+        if client_pool.cache is not None:
+            summary.append(f"  {client_pool.cache.summary()}")
+        if client_pool.scheduler is not None:
+            summary.append(f"  {client_pool.scheduler.summary()}")
+        if client_pool.router is not None:
+            summary.append("  " + client_pool.router.summary().replace("\n", "\n  "))
+        logger.info("%s", "\n".join(summary))
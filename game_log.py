@@ -0,0 +1,163 @@
+"""A compact, columnar log of game outcomes for analysing many games at once.
+
+Each game is written as fixed-size integer-coded records to three append-only binary files per writer (shard):
+
+- `<shard>.games.bin`: one row per game (seed, number of players, rounds played, winner)
+- `<shard>.players.bin`: one row per dealt card (game, player, role)
+- `<shard>.events.bin`: one row per vote, elimination and seer reveal (game, round, phase, kind, actor, target)
+
+Games are numbered by their row in the games file, so the other tables index straight into it. `load_game_log`
+memory-maps every shard and renumbers games so they index into the combined games table.
+"""
+
+import glob
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# Codes are positions in these lists: add new roles at the end so existing logs keep their meaning
+ROLES = ["villager", "werewolf", "seer"]
+PHASES = ["day", "night"]
+WINNERS = [None, "villagers", "werewolves"]
+
+# Event kinds
+VOTE = 0
+ELIMINATION = 1
+SEER_REVEAL = 2
+
+GAME_DTYPE = np.dtype([("seed", "<i8"), ("players", "<u2"), ("rounds", "<u2"), ("winner", "u1")])
+PLAYER_DTYPE = np.dtype([("game", "<u4"), ("player", "<u2"), ("role", "u1")])
+EVENT_DTYPE = np.dtype(
+    [("game", "<u4"), ("round", "<u2"), ("phase", "u1"), ("kind", "u1"), ("actor", "<u2"), ("target", "<u2")]
+)
+TABLES = {"games": GAME_DTYPE, "players": PLAYER_DTYPE, "events": EVENT_DTYPE}
+
+
+class GameEvents:
+    """A game's events, integer-coded and buffered in memory until the game is written to a log."""
+
+    def __init__(self):
+        self.rows: list[tuple[int, int, int, int, int]] = []
+
+    def record(self, round: int, phase: str, kind: int, actor: int, target: int):
+        """Record an event. The actor is 0 for the host (e.g. for eliminations)."""
+        self.rows.append((round, PHASES.index(phase), kind, actor, target))
+
+
+@dataclass
+class GameLogTables:
+    """The games, players and events tables of a log, with games numbered by their row in `games`."""
+
+    games: np.ndarray
+    players: np.ndarray
+    events: np.ndarray
+
+
+class GameLog:
+    """Appends finished games to one shard of a columnar game log.
+
+    Give each process writing to the same directory its own shard (the default is named after the process id) so
+    their appends never interleave.
+    """
+
+    def __init__(self, directory: str, shard: Optional[str] = None):
+        self.directory = directory
+        self.shard = shard or f"shard_{os.getpid()}"
+        os.makedirs(directory, exist_ok=True)
+        self._next_game = self._repair()
+
+    def _repair(self) -> int:
+        """Trim anything a previous writer left half-written, so appends stay aligned. Returns the number of games."""
+        games_path = self._path("games")
+        games = os.path.getsize(games_path) // GAME_DTYPE.itemsize if os.path.exists(games_path) else 0
+        for table, dtype in TABLES.items():
+            path = self._path(table)
+            if not os.path.exists(path):
+                continue
+            rows = games if table == "games" else np.searchsorted(_read(path, dtype)["game"], games)
+            with open(path, "r+b") as f:
+                f.truncate(int(rows) * dtype.itemsize)
+        return games
+
+    def _path(self, table: str) -> str:
+        return os.path.join(self.directory, f"{self.shard}.{table}.bin")
+
+    def _append(self, table: str, rows: np.ndarray):
+        with open(self._path(table), "ab") as f:
+            rows.tofile(f)
+
+    def write(
+        self,
+        dealt_roles: dict[int, str],
+        events: GameEvents,
+        rounds: int,
+        winner: Optional[str],
+        seed: Optional[int] = None,
+    ) -> int:
+        """Append a finished game and return its number within the shard.
+
+        Events naming a player who wasn't dealt in (e.g. a vote for a player who doesn't exist) are left out.
+        """
+        game = self._next_game
+        self._next_game += 1
+
+        players = np.array(
+            [(game, player, ROLES.index(role)) for player, role in sorted(dealt_roles.items())], dtype=PLAYER_DTYPE
+        )
+        event_rows = np.array(
+            [
+                (game, round, phase, kind, actor, target)
+                for round, phase, kind, actor, target in events.rows
+                if (actor == 0 or actor in dealt_roles) and target in dealt_roles
+            ],
+            dtype=EVENT_DTYPE,
+        )
+        # Write the game row last, so a crash mid-write never leaves a game whose players or events are missing
+        self._append("players", players)
+        self._append("events", event_rows)
+        self._append(
+            "games",
+            np.array(
+                [(-1 if seed is None else seed, len(dealt_roles), rounds, WINNERS.index(winner))], dtype=GAME_DTYPE
+            ),
+        )
+        return game
+
+
+def _read(path: str, dtype: np.dtype) -> np.ndarray:
+    if not os.path.exists(path) or os.path.getsize(path) < dtype.itemsize:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(os.path.getsize(path) // dtype.itemsize,))
+
+
+def load_game_log(directory: str) -> GameLogTables:
+    """Load every shard in a directory, memory-mapped (or concatenated if there are several shards)."""
+    shards = sorted(p[: -len(".games.bin")] for p in glob.glob(os.path.join(directory, "*.games.bin")))
+    tables: dict[str, list[np.ndarray]] = {name: [] for name in TABLES}
+    offset = 0
+    for shard in shards:
+        games = _read(f"{shard}.games.bin", GAME_DTYPE)
+        players = _read(f"{shard}.players.bin", PLAYER_DTYPE)
+        events = _read(f"{shard}.events.bin", EVENT_DTYPE)
+        # Drop rows of a game whose game row was never written (the writer stopped part way through)
+        players = players[: np.searchsorted(players["game"], len(games))]
+        events = events[: np.searchsorted(events["game"], len(games))]
+        if offset:
+            players = players.copy()
+            events = events.copy()
+            players["game"] += offset
+            events["game"] += offset
+        tables["games"].append(games)
+        tables["players"].append(players)
+        tables["events"].append(events)
+        offset += len(games)
+
+    def combine(name: str) -> np.ndarray:
+        parts = tables[name]
+        if not parts:
+            return np.zeros(0, dtype=TABLES[name])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    return GameLogTables(games=combine("games"), players=combine("players"), events=combine("events"))
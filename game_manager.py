@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class GameManager:
+    """Runs each session's game as its own asyncio task, with a cap on how many play at once per process.
+
+    Games started while the cap is reached wait in a queue (in start order) for a free slot. Cancelling a session's
+    game, e.g. when its viewer disconnects, stops it wherever it is, including while it's still queued.
+    """
+
+    def __init__(self, max_active_games: int = 10):
+        self.max_active_games = max_active_games
+        self.active = 0
+        self.queued = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    @property
+    def is_full(self) -> bool:
+        return self.active + self.queued >= self.max_active_games
+
+    def summary(self) -> str:
+        return f"Games: {self.active} active, {self.queued} queued (max {self.max_active_games} active)"
+
+    def start(self, session_id: str, run_game: Callable[[], Awaitable[None]]) -> asyncio.Task:
+        """Start (or queue) the game for a session. A session only ever has one game running."""
+        if session_id in self._tasks:
+            return self._tasks[session_id]
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_active_games)
+
+        task = asyncio.create_task(self._run(run_game))
+        self._tasks[session_id] = task
+        task.add_done_callback(lambda t: self._finished(session_id, t))
+        return task
+
+    async def _run(self, run_game: Callable[[], Awaitable[None]]):
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.active += 1
+        try:
+            await run_game()
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def _finished(self, session_id: str, task: asyncio.Task):
+        self._tasks.pop(session_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Game for session %s failed", session_id, exc_info=task.exception())
+        logger.info(self.summary())
+
+    def cancel(self, session_id: str) -> bool:
+        """Cancel a session's game, returning whether there was one."""
+        task = self._tasks.get(session_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    async def shutdown(self):
+        """Cancel every game and wait for them to stop."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
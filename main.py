@@ -1,42 +1,35 @@
+import logging
 import os
-import chainlit as cl
 
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from dotenv import load_dotenv
+import chainlit as cl
 
+from clients.client_pool import client_pool
+from config import load_model_config, load_model_router, load_request_scheduler, load_response_cache
 from game import WerewolfGame
-from roles.seer import Seer
-from roles.villager import Villager
-from roles.werewolf import Werewolf
+from game_manager import GameManager
+from roles.deck import DEFAULT_ROLES, parse_roles, role_classes, validate_roles
+from telemetry import recorder
 from ui.message_handler import MessageHandler
+from utils import configure_logging
 
-load_dotenv()
-
-token_provider = get_bearer_token_provider(DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
+logger = logging.getLogger(__name__)
 
-model_config = {
-    "azure_deployment": os.getenv("MODEL_DEPLOYMENT"),
-    "model": os.getenv("MODEL_NAME"),
-    "api_version": "2024-10-21",
-    "azure_endpoint": os.getenv("AZURE_OPENAI_ENDPOINT"),
-    "azure_ad_token_provider": token_provider,
-}
+configure_logging()
+model_config = load_model_config()
+client_pool.cache = load_response_cache()
+client_pool.scheduler = load_request_scheduler()
+client_pool.router = load_model_router()
+recorder.output_dir = os.getenv("TELEMETRY_DIR")
+# The cards dealt out each game, e.g. GAME_ROLES=villager,villager,villager,werewolf,seer (checked at startup)
+roles = parse_roles(os.getenv("GAME_ROLES", ",".join(DEFAULT_ROLES)))
+validate_roles(roles)
 
-message_handler = MessageHandler()
+game_manager = GameManager(max_active_games=int(os.getenv("MAX_ACTIVE_GAMES", "10")))
 
 
-async def start_game():
-    # Pick the roles in play (i.e. the cards to be dealt out)
-    roles = [
-        Villager,
-        Villager,
-        Villager,
-        Werewolf,
-        Seer,
-    ]  # TODO: make this user input and validate number of allowed roles depending on number of players
-
+async def start_game(message_handler: MessageHandler):
     # Create a new game
-    game = WerewolfGame(model_config, message_handler, roles)
+    game = WerewolfGame(model_config, message_handler, role_classes(roles))
     await game.run()
 
 
@@ -50,7 +43,20 @@ async def on_chat_start():
     ).send()
 
     if res and res.get("payload").get("value") == "continue":
-        await start_game()
+        # Each session gets its own handler (and task list) so games don't write into each other's UI
+        message_handler = MessageHandler()
+        cl.user_session.set("message_handler", message_handler)
+        if game_manager.is_full:
+            await message_handler.send_message("All tables are busy. Your game will start as soon as one is free...")
+        game_manager.start(cl.context.session.id, lambda: start_game(message_handler))
+        logger.info(game_manager.summary())
+
+
+@cl.on_chat_end
+async def on_chat_end():
+    """Stop the session's game when its viewer disconnects."""
+    if game_manager.cancel(cl.context.session.id):
+        logger.info("Cancelled game for disconnected session %s", cl.context.session.id)
 
 
 @cl.on_message
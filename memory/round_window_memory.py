@@ -0,0 +1,177 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from autogen_core import CancellationToken
+from autogen_core.memory import Memory, MemoryContent, MemoryMimeType, MemoryQueryResult, UpdateContextResult
+from autogen_core.model_context import ChatCompletionContext
+from autogen_core.models import ChatCompletionClient, SystemMessage, UserMessage
+
+from prompts import LayeredChatCompletionContext
+from telemetry import count_for_next_call
+
+Summariser = Callable[[int, list[str]], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text), good enough for budgeting."""
+    return len(text) // 4 + 1
+
+
+async def summarise_extractive(round: int, entries: list[str], max_chars_per_entry: int = 160) -> str:
+    """Summarise a round by keeping the first sentence of each entry, without calling a model."""
+    lines = []
+    for entry in entries:
+        sentence = entry.strip().split(". ")[0]
+        if len(sentence) > max_chars_per_entry:
+            sentence = sentence[: max_chars_per_entry - 3] + "..."
+        lines.append(sentence.rstrip("."))
+    return "; ".join(lines)
+
+
+def model_summariser(client: ChatCompletionClient) -> Summariser:
+    """A summariser that asks a (typically small, cheap) model to summarise each round.
+
+    Falls back to the extractive summary if the model doesn't return text.
+    """
+
+    async def summarise(round: int, entries: list[str]) -> str:
+        result = await client.create(
+            [
+                SystemMessage(
+                    content="Summarise this round of a game of Werewolf from one player's notes in two or three "
+                    "sentences. Keep who accused, voted for or was eliminated, and any roles revealed."
+                ),
+                UserMessage(content=f"Round {round}:\n" + "\n".join(entries), source="host"),
+            ]
+        )
+        if isinstance(result.content, str) and result.content.strip():
+            return result.content.strip()
+        return await summarise_extractive(round, entries)
+
+    return summarise
+
+
+class RoundWindowMemory(Memory):
+    """Memory that keeps the current round verbatim and compacts older rounds into per-round summaries.
+
+    Entries are grouped by the `round` in their metadata (entries without one belong to the current round), which
+    must come from the game rather than a model. The current round is the latest one started with `start_round` or
+    seen in an entry. Once a later round starts, earlier rounds are summarised and only their summaries are injected
+    into the model context; an entry added to a round after it was summarised has the round summarised again. Within
+    `token_budget`, the current round's newest entries come first, then the newest summaries.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        token_budget: int = 1500,
+        summariser: Summariser = summarise_extractive,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+    ):
+        self.name = name
+        self.token_budget = token_budget
+        self.summariser = summariser
+        self.count_tokens = count_tokens
+        self._rounds: dict[int, list[MemoryContent]] = {}
+        self._summaries: dict[int, MemoryContent] = {}
+        # Round -> how many of its entries its summary covers
+        self._summarised: dict[int, int] = {}
+        self.current_round = 0
+        self._lock = asyncio.Lock()
+
+        # Tokens injected by (and saved versus injecting everything verbatim on) the last and all calls
+        self.last_injected_tokens = 0
+        self.last_tokens_saved = 0
+        self.total_tokens_saved = 0
+
+    def start_round(self, round: int):
+        """Start a new round of the game, making the rounds before it eligible for summarising."""
+        self.current_round = max(self.current_round, round)
+
+    async def add(self, content: MemoryContent, cancellation_token: Optional[CancellationToken] = None) -> None:
+        round = (content.metadata or {}).get("round", self.current_round)
+        self.start_round(round)
+        self._rounds.setdefault(round, []).append(content)
+
+    async def _compact(self):
+        """Summarise any finished round that doesn't have an up to date summary."""
+        async with self._lock:
+            for round, contents in sorted(self._rounds.items()):
+                if round >= self.current_round or self._summarised.get(round) == len(contents):
+                    continue
+                # Entries added while the summariser runs are left for the next compaction
+                entries = [str(c.content) for c in contents]
+                summary = await self.summariser(round, entries)
+                self._summarised[round] = len(entries)
+                self._summaries[round] = MemoryContent(
+                    content=f"Round {round}: {summary}",
+                    mime_type=MemoryMimeType.TEXT,
+                    metadata={"type": "summary", "round": round},
+                )
+
+    def _window(self) -> tuple[list[MemoryContent], list[MemoryContent]]:
+        """The summaries (oldest first, within budget) and current round entries to inject."""
+        budget = self.token_budget
+        current = []
+        for content in reversed(self._rounds.get(self.current_round, [])):
+            tokens = self.count_tokens(str(content.content))
+            if tokens > budget:
+                break
+            current.insert(0, content)
+            budget -= tokens
+        summaries = []
+        for round in sorted(self._summaries, reverse=True):
+            tokens = self.count_tokens(str(self._summaries[round].content))
+            if tokens > budget:
+                break
+            summaries.insert(0, self._summaries[round])
+            budget -= tokens
+        return summaries, current
+
+    async def update_context(self, model_context: ChatCompletionContext) -> UpdateContextResult:
+        await self._compact()
+        summaries, current = self._window()
+        if not summaries and not current:
+            return UpdateContextResult(memories=MemoryQueryResult(results=[]))
+
+        summary_context = ""
+        if summaries:
+            summary_context += f"\nSummary of {self.name} from earlier rounds:\n"
+            summary_context += "\n".join(str(s.content) for s in summaries) + "\n"
+        current_context = ""
+        if current:
+            current_context += f"\nRelevant {self.name} from this round (in chronological order):\n"
+            current_context += "\n".join(f"{i}. {c.content}" for i, c in enumerate(current, 1)) + "\n"
+        memory_context = summary_context + current_context
+        if isinstance(model_context, LayeredChatCompletionContext):
+            # Summaries only change between rounds, so keep them ahead of this round's entries in the prompt
+            model_context.set_layer("summary", self.name, summary_context)
+            model_context.set_layer("current", self.name, current_context)
+        else:
+            await model_context.add_message(SystemMessage(content=memory_context))
+
+        verbatim_tokens = sum(self.count_tokens(str(c.content)) for r in self._rounds.values() for c in r)
+        self.last_injected_tokens = self.count_tokens(memory_context)
+        self.last_tokens_saved = max(0, verbatim_tokens - self.last_injected_tokens)
+        self.total_tokens_saved += self.last_tokens_saved
+        count_for_next_call(memory_tokens_saved=self.last_tokens_saved)
+
+        return UpdateContextResult(memories=MemoryQueryResult(results=summaries + current))
+
+    async def query(
+        self,
+        query: str | MemoryContent = "",
+        cancellation_token: Optional[CancellationToken] = None,
+        **kwargs: Any,
+    ) -> MemoryQueryResult:
+        summaries, current = self._window()
+        return MemoryQueryResult(results=summaries + current)
+
+    async def clear(self) -> None:
+        self._rounds.clear()
+        self._summaries.clear()
+        self._summarised.clear()
+        self.current_round = 0
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,185 @@
+import json
+import os
+import re
+import zlib
+from typing import Any, Optional
+
+import numpy as np
+from autogen_core import CancellationToken
+from autogen_core.memory import Memory, MemoryContent, MemoryQueryResult, UpdateContextResult
+from autogen_core.model_context import ChatCompletionContext
+from autogen_core.models import SystemMessage, UserMessage
+
+from prompts import LayeredChatCompletionContext
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingVectorizer:
+    """Embeds text as a hashed bag of words and word pairs. CPU-only, stateless and stable across processes."""
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        words = TOKEN_PATTERN.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Embed a batch of texts into an (n, dim) array of unit-length float32 vectors."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            # crc32 rather than hash() so the same text maps to the same vector in every process
+            indices = [zlib.crc32(f.encode("utf-8")) for f in self._features(text)]
+            if indices:
+                index_array = np.array(indices, dtype=np.uint32)
+                signs = np.where(index_array & 0x80000000, -1.0, 1.0).astype(np.float32)
+                np.add.at(vectors[row], index_array % self.dim, signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class VectorMemory(Memory):
+    """Memory that injects only the top-k entries most relevant to the current task into the model context.
+
+    The query is the latest user message in the model context (i.e. the HOST's task for this call), not anything
+    another memory has added after it. Added entries are embedded in batches the next time the index is needed.
+    If `path` is given, vectors are kept in a memory-mapped file (`<path>.f32`) and entries in `<path>.jsonl`, so
+    the memory survives restarts: an existing index is reopened and grown in place rather than rebuilt.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        k: int = 8,
+        vectorizer: Optional[HashingVectorizer] = None,
+        path: Optional[str] = None,
+        initial_capacity: int = 256,
+    ):
+        self.name = name
+        self.k = k
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.path = path
+        self._contents: list[MemoryContent] = []
+        self._pending: list[MemoryContent] = []
+        self._count = 0
+
+        # Size of the memory injected by the last call, for comparing prompt size against injecting everything
+        self.last_injected_chars = 0
+
+        if path and os.path.exists(f"{path}.jsonl") and os.path.exists(f"{path}.f32"):
+            # Vectors are flushed before their entries are appended, so they cover every entry
+            with open(f"{path}.jsonl", encoding="utf-8") as f:
+                self._contents = [MemoryContent(**json.loads(line)) for line in f if line.strip()]
+            self._count = len(self._contents)
+        elif path:
+            # Entries without their vectors can't be searched, so start the index afresh
+            open(f"{path}.jsonl", "w", encoding="utf-8").close()
+        self._vectors = np.zeros((0, self.vectorizer.dim), dtype=np.float32)
+        self._vectors = self._allocate(max(initial_capacity, self._count))
+
+    def __len__(self) -> int:
+        return self._count + len(self._pending)
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        """Vector storage with room for at least `capacity` entries, keeping the ones already stored."""
+        shape = (capacity, self.vectorizer.dim)
+        if not self.path:
+            vectors = np.zeros(shape, dtype=np.float32)
+            if self._count:
+                vectors[: self._count] = self._vectors[: self._count]
+            return vectors
+
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+            # Drop the mapping before the file is resized
+            self._vectors = np.zeros((0, self.vectorizer.dim), dtype=np.float32)
+        file = f"{self.path}.f32"
+        size = capacity * self.vectorizer.dim * 4
+        with open(file, "ab"):
+            pass  # Create the file if it doesn't exist yet, without touching one that does
+        if os.path.getsize(file) < size:
+            # Extending the file pads it with zeros and leaves the stored vectors where they are
+            os.truncate(file, size)
+        capacity = os.path.getsize(file) // (4 * self.vectorizer.dim)
+        return np.memmap(file, dtype=np.float32, mode="r+", shape=(capacity, self.vectorizer.dim))
+
+    def _flush(self):
+        """Embed any pending entries as one batch and append them to the index."""
+        if not self._pending:
+            return
+        needed = self._count + len(self._pending)
+        if needed > self._vectors.shape[0]:
+            self._vectors = self._allocate(max(needed, self._vectors.shape[0] * 2))
+
+        self._vectors[self._count : needed] = self.vectorizer.embed([str(c.content) for c in self._pending])
+        if self.path:
+            self._vectors.flush()
+            with open(f"{self.path}.jsonl", "a", encoding="utf-8") as f:
+                for content in self._pending:
+                    f.write(content.model_dump_json() + "\n")
+
+        self._contents.extend(self._pending)
+        self._count = needed
+        self._pending = []
+
+    def truncate(self, count: int):
+        """Forget all but the first `count` entries, e.g. ones stored after the checkpoint a game resumes from."""
+        self._flush()
+        if count >= self._count:
+            return
+        self._contents = self._contents[:count]
+        self._count = count
+        if self.path:
+            with open(f"{self.path}.jsonl", "w", encoding="utf-8") as f:
+                for content in self._contents:
+                    f.write(content.model_dump_json() + "\n")
+
+    def search(self, query: str, k: Optional[int] = None) -> list[MemoryContent]:
+        """The k entries most similar to the query, in the order they were added."""
+        self._flush()
+        k = k or self.k
+        if self._count <= k:
+            return list(self._contents)
+        scores = self._vectors[: self._count] @ self.vectorizer.embed([query])[0]
+        top = np.argpartition(-scores, k)[:k]
+        return [self._contents[i] for i in sorted(top)]
+
+    async def add(self, content: MemoryContent, cancellation_token: Optional[CancellationToken] = None) -> None:
+        self._pending.append(content)
+
+    async def update_context(self, model_context: ChatCompletionContext) -> UpdateContextResult:
+        messages = await model_context.get_messages()
+        task = next((m for m in reversed(messages) if isinstance(m, UserMessage)), None)
+        query = str(task.content) if task is not None else ""
+        results = self.search(query)
+        if not results:
+            return UpdateContextResult(memories=MemoryQueryResult(results=[]))
+
+        memory_strings = [f"{i}. {str(memory.content)}" for i, memory in enumerate(results, 1)]
+        memory_context = f"\nRelevant {self.name} (in chronological order):\n" + "\n".join(memory_strings) + "\n"
+        self.last_injected_chars = len(memory_context)
+        if isinstance(model_context, LayeredChatCompletionContext):
+            # What's relevant changes with every query, so it goes in the least stable layer
+            model_context.set_layer("current", self.name, memory_context)
+        else:
+            await model_context.add_message(SystemMessage(content=memory_context))
+        return UpdateContextResult(memories=MemoryQueryResult(results=results))
+
+    async def query(
+        self,
+        query: str | MemoryContent = "",
+        cancellation_token: Optional[CancellationToken] = None,
+        **kwargs: Any,
+    ) -> MemoryQueryResult:
+        text = str(query.content) if isinstance(query, MemoryContent) else query
+        return MemoryQueryResult(results=self.search(text, kwargs.get("k")))
+
+    async def clear(self) -> None:
+        self._pending = []
+        self.truncate(0)
+
+    async def close(self) -> None:
+        self._flush()
+        if self.path:
+            self._vectors.flush()
@@ -0,0 +1,131 @@
+import hashlib
+from collections import OrderedDict
+from typing import Iterable, Iterator, Literal, Optional, Sequence
+
+from autogen_core.model_context import UnboundedChatCompletionContext
+from autogen_core.models import LLMMessage, SystemMessage
+from autogen_core.tools import Tool, ToolSchema
+
+# Prompt layers that memories fill in after the player's role prompt, from most to least stable:
+# - summary: compacted memories of earlier rounds, which only change when a round ends
+# - current: memories of the current round, which change as it goes on
+PromptLayer = Literal["summary", "current"]
+LAYERS: list[PromptLayer] = ["summary", "current"]
+
+
+class Transcript(Sequence[LLMMessage]):
+    """An immutable record of what was said in a discussion, shared by every player who heard it.
+
+    Players' model contexts hold a reference to the transcript rather than a copy of its messages, and anything an
+    agent adds while reflecting or voting goes into its own context, so one player's private reflections can never
+    reach another player, and players can reflect and vote concurrently.
+    """
+
+    __slots__ = ("_messages",)
+
+    def __init__(self, messages: Iterable[LLMMessage] = ()):
+        self._messages = tuple(messages)
+
+    def __getitem__(self, index):
+        return self._messages[index]
+
+    def __iter__(self) -> Iterator[LLMMessage]:
+        return iter(self._messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __add__(self, other: Iterable[LLMMessage]) -> "Transcript":
+        """A new transcript with more messages after these (this one is unchanged)."""
+        return Transcript(self._messages + tuple(other))
+
+
+class LayeredChatCompletionContext(UnboundedChatCompletionContext):
+    """A model context that assembles the prompt from the most to the least stable content, so that consecutive
+    calls (and different players' calls) share as long a prefix as possible for the provider's prompt cache.
+
+    After the agent's system message (the rules, identical for every player), the prompt is: the player's role,
+    summaries of earlier rounds, this round's memories, then the shared discussion transcript (if any), then the
+    agent's own conversation and task. Memories add their content with `set_layer` rather than appending a system
+    message after the task, and setting a layer again replaces it rather than adding a copy.
+
+    Providers put the tools ahead of the messages, so only calls offering the same tools share a prefix at all.
+    Votes, reflections and seer choices offer every player the same ones, but discussion agents can hand off to
+    every player except themselves, so discussion calls only share a prefix with the same player's earlier calls.
+    """
+
+    def __init__(self, role_prompt: str, initial_messages: Optional[list[LLMMessage]] = None):
+        super().__init__(initial_messages)
+        self.role_prompt = role_prompt
+        self._layers: dict[tuple[PromptLayer, str], str] = {}
+        self._transcript = Transcript()
+
+    def set_layer(self, layer: PromptLayer, name: str, content: str):
+        """Set the content of a layer from a given source (e.g. a memory), replacing any it set before."""
+        if content:
+            self._layers[(layer, name)] = content
+        else:
+            self._layers.pop((layer, name), None)
+
+    def set_transcript(self, transcript: Transcript):
+        """Show the agent a (read-only) discussion transcript before its own messages, until the context is cleared."""
+        self._transcript = transcript
+
+    async def get_messages(self) -> list[LLMMessage]:
+        layers = [SystemMessage(content=self.role_prompt)]
+        for layer in LAYERS:
+            layers.extend(SystemMessage(content=c) for (key, _), c in self._layers.items() if key == layer)
+        return layers + list(self._transcript) + await super().get_messages()
+
+    async def clear(self) -> None:
+        await super().clear()
+        self._layers.clear()
+        self._transcript = Transcript()
+
+
+class PrefixCacheEstimator:
+    """Estimates how many of a prompt's tokens a provider-side prompt cache could serve, from the prefixes it's seen.
+
+    Models the OpenAI/Azure behaviour: prompts of at least `min_tokens` are cached in `block_tokens` increments, and
+    a call is served from the cache up to the longest block boundary whose prefix was seen before. Token counts are
+    estimated at ~4 characters per token. This is an upper bound on the real reuse, as the provider's cache is shared
+    with other traffic, expires entries and may route calls to different cache shards.
+    """
+
+    def __init__(self, min_tokens: int = 1024, block_tokens: int = 128, max_entries: int = 200_000):
+        self.min_chars = min_tokens * 4
+        self.block_chars = block_tokens * 4
+        self.max_entries = max_entries
+        self._seen: OrderedDict[bytes, None] = OrderedDict()
+
+    @staticmethod
+    def serialise(messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema] = []) -> str:
+        """The prompt as the provider sees it, near enough: tools first, then each message's role and content."""
+        parts = [t.schema["name"] if isinstance(t, Tool) else t["name"] for t in tools]
+        parts.extend(f"{type(m).__name__}:{getattr(m, 'source', '')}:{m.content}" for m in messages)
+        return "\n".join(parts)
+
+    def observe(self, messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema] = []) -> int:
+        """Record a prompt and return the estimated number of its tokens served from the cache."""
+        text = self.serialise(messages, tools).encode("utf-8")
+        if len(text) < self.min_chars:
+            return 0
+
+        cached_chars = 0
+        digest = hashlib.sha1()
+        position = 0
+        for boundary in range(self.min_chars, len(text) + 1, self.block_chars):
+            digest.update(text[position:boundary])
+            position = boundary
+            key = digest.digest()
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                cached_chars = boundary
+            else:
+                self._seen[key] = None
+        while len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+        return cached_chars // 4
+
+
+prefix_cache = PrefixCacheEstimator()
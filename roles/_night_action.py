@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from game import WerewolfGame
+    from roles._role import Role
+
+
+class NightAction(ABC):
+    """Something a role does at night, declared on the role class as its `night_action`.
+
+    Every night, each action with living players decides what to do at the same time as the others (so a new role
+    doesn't add a model round trip to the night), then the decisions are resolved one at a time by increasing
+    `order`. Deciding must not change the game (votes, events, eliminations, or what other players know): the
+    deciding players may only record their own thoughts. Only resolving may change the game.
+    """
+
+    # When this action resolves relative to the others (lower first), e.g. a protection before the werewolves' kill
+    order = 100
+
+    @abstractmethod
+    async def decide(self, game: "WerewolfGame", players: list["Role"]) -> Any:
+        """Decide on the action for the given living players with this role, returning the decision."""
+
+    @abstractmethod
+    async def resolve(self, game: "WerewolfGame", players: list["Role"], decision: Any):
+        """Apply the decision to the game."""
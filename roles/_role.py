@@ -1,33 +1,22 @@
 from abc import ABC
+from typing import Any, Hashable, Optional
 
 from autogen_agentchat.agents import AssistantAgent
-from autogen_core.memory import ListMemory, MemoryContent, MemoryMimeType
-from autogen_core.model_context import ChatCompletionContext
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from autogen_core import CancellationToken
+from autogen_core.memory import Memory, MemoryContent, MemoryMimeType
 
+from clients.client_pool import client_pool
+from clients.instrumented_client import InstrumentedChatCompletionClient
+from memory.round_window_memory import RoundWindowMemory, model_summariser, summarise_extractive
+from memory.vector_memory import VectorMemory
 from models.agent_vote_response import AgentVoteResponse
-from ui.message_handler import MessageHandler
-
-
-class Role(ABC):
-    """A base role used to implement a player in the Werewolf game."""
-
-    def __init__(
-        self,
-        model_config: dict[str, str],
-        message_handler: MessageHandler,
-        id: int,
-    ):
-        self.id = id
-        self.model_config = model_config
-        self.message_handler = message_handler
-
-        # Create a memory for recording the player's internal thoughts
-        self.thoughts = ListMemory(name="thoughts")  # TODO: change to vector and make persistent
-        self.events = ListMemory(name="events")  # TODO: change to vector and make persistent
-        self.system_prompt = f"""
-      You are Player {id} in a game of Werewolf.
+from prompts import LayeredChatCompletionContext, Transcript, prefix_cache
+from roles._night_action import NightAction
+from telemetry import recorder
+from ui.base_message_handler import BaseMessageHandler
 
+# Shared by every player (and every call), so that it forms a common prompt prefix the provider can cache
+RULES = """
       Objectives:
       - The game is divided into two teams: the werewolves and the villagers
       - The werewolves must kill off the villagers without being caught
@@ -54,65 +43,178 @@ class Role(ABC):
       - Discussions with other players will end either after 60 seconds or until all have uttered **READY TO VOTE**
     """
 
-    def get_agent_for_discussion(self, player_ids: list[int]) -> AssistantAgent:
-        """Create agent to discuss with other players"""
+
+class Role(ABC):
+    """A base role used to implement a player in the Werewolf game."""
+
+    # What players with this role do at night (None for roles that sleep through it)
+    night_action: Optional[type[NightAction]] = None
+    # Which memory players use: "round_window" (recent rounds verbatim, older ones summarised) or "vector" (top-k)
+    memory_backend = "round_window"
+    # Approximate tokens each of a player's memories may inject into a model call (round_window)
+    memory_token_budget = 1500
+    # How older rounds are summarised (round_window): "extractive" (no model call) or "model" (the summarise route)
+    memory_summariser = "extractive"
+    # Number of most relevant entries each of a player's memories injects into a model call (vector)
+    memory_top_k = 8
+
+    def __init__(
+        self,
+        model_config: dict[str, str],
+        message_handler: BaseMessageHandler,
+        id: int,
+        memory_path: Optional[str] = None,
+    ):
+        self.id = id
+        self.model_config = model_config
+        self.message_handler = message_handler
+        # Prefix of the files the player's memories are persisted to (vector), or None to keep them in memory only
+        self.memory_path = memory_path
+        # The game's current round, which the player's memories are kept by
+        self.round = 1
+        # Long-lived agents (and their model contexts and variants) by call type, reset between uses rather than rebuilt
+        self._agents: dict[str, tuple[AssistantAgent, LayeredChatCompletionContext, Hashable]] = {}
+
+        # Every entry added to the player's memories, in order, so they can be checkpointed and restored
+        self.memory_log: list[tuple[str, MemoryContent]] = []
+
+        # Create a memory for recording the player's internal thoughts
+        self.thoughts = self.create_memory("thoughts")
+        self.events = self.create_memory("events")
+        # The rules are the same for every player, so they come first; the player's id and role follow them
+        self.system_prompt = RULES
+        self.role_prompt = f"You are Player {id} in a game of Werewolf."
+
+    def create_memory(self, name: str) -> Memory:
+        """Create one of the player's memories using the configured memory backend."""
+        if self.memory_backend == "vector":
+            path = f"{self.memory_path}_{name}" if self.memory_path else None
+            return VectorMemory(name=name, k=self.memory_top_k, path=path)
+        summariser = summarise_extractive
+        if self.memory_summariser == "model":
+            summariser = model_summariser(
+                InstrumentedChatCompletionClient(
+                    client_pool.get(self.model_config, "summarise"),
+                    recorder,
+                    prefix_cache=prefix_cache,
+                    player=self.id,
+                    call_type="summarise",
+                )
+            )
+        return RoundWindowMemory(name=name, token_budget=self.memory_token_budget, summariser=summariser)
+
+    async def get_agent(
+        self,
+        call_type: str,
+        transcript: Transcript | None = None,
+        client_args: dict[str, Any] | None = None,
+        variant: Hashable = None,
+        **agent_args: Any,
+    ) -> AssistantAgent:
+        """Get this player's persistent agent for a call type, reset and shown the given discussion transcript.
+
+        The call type (discussion, vote, reflect, seer) decides which model serves the agent's calls (if a model
+        router is set) and how they're prioritised.
+        Only one agent is kept per call type: if its settings (e.g. handoffs) have changed since it was built, as
+        told by a different `variant`, it's rebuilt. The transcript is shared with the other players rather than
+        copied, and the agent's own messages are kept apart from it.
+        """
+        if call_type not in self._agents or self._agents[call_type][2] != variant:
+            model_context = LayeredChatCompletionContext(self.role_prompt)
+            model_client = InstrumentedChatCompletionClient(
+                client_pool.get(self.model_config, call_type, **(client_args or {})),
+                recorder,
+                prefix_cache=prefix_cache,
+                player=self.id,
+                call_type=call_type,
+            )
+            agent = AssistantAgent(
+                name=f"player_{self.id}",
+                model_client=model_client,
+                model_context=model_context,
+                system_message=self.system_prompt,
+                memory=[self.events, self.thoughts],
+                **agent_args,
+            )
+            self._agents[call_type] = (agent, model_context, variant)
+
+        agent, model_context, _ = self._agents[call_type]
+        await agent.on_reset(CancellationToken())
+        if transcript is not None:
+            model_context.set_transcript(transcript)
+        return agent
+
+    async def get_agent_for_discussion(self, player_ids: list[int]) -> AssistantAgent:
+        """Get agent to discuss with other players"""
         if len(player_ids) > 1:
             handoffs = [f"player_{id}" for id in player_ids if id != self.id]
-            client = AzureOpenAIChatCompletionClient(**self.model_config, parallel_tool_calls=False)
-        else:
-            handoffs = None
-            client = AzureOpenAIChatCompletionClient(**self.model_config)
-
-        return AssistantAgent(
-            name=f"player_{self.id}",
-            model_client=client,
-            handoffs=handoffs,
-            memory=[self.events, self.thoughts],
-            system_message=self.system_prompt,
-            model_client_stream=True,  # Enable streaming tokens from the model client.
-        )
+            return await self.get_agent(
+                "discussion",
+                variant=tuple(handoffs),
+                client_args={"parallel_tool_calls": False},
+                handoffs=handoffs,
+                model_client_stream=True,  # Enable streaming tokens from the model client.
+            )
+
+        return await self.get_agent("discussion", model_client_stream=True)
 
-    async def make_vote(self, chat_context: ChatCompletionContext) -> AgentVoteResponse:
+    async def make_vote(self, transcript: Transcript) -> AgentVoteResponse:
         """Tell agent to make a vote"""
-        model_client = AzureOpenAIChatCompletionClient(response_format=AgentVoteResponse, **self.model_config)
-        agent = AssistantAgent(
-            name=f"player_{self.id}",
-            model_client=model_client,
-            model_context=chat_context,
-            system_message=self.system_prompt,
-            memory=[self.events, self.thoughts],
-        )
+        agent = await self.get_agent("vote", transcript, client_args={"response_format": AgentVoteResponse})
         result = await agent.run(
             task="HOST: use your memories and thoughts from previous discussions to determine the player you'd like to eliminate with a brief reason why."
         )
         message = AgentVoteResponse.model_validate_json(result.messages[-1].content)
         return message
 
-    async def reflect_on_discussion(self, chat_context: ChatCompletionContext):
+    async def reflect_on_discussion(self, transcript: Transcript):
         """Reflect on the discussion and store summary to memory"""
-        # TODO: can we remove the need to keep creating a new agent for each task?
-        agent = AssistantAgent(
-            name=f"player_{self.id}",
-            model_client=AzureOpenAIChatCompletionClient(**self.model_config),
-            model_context=chat_context,
-            system_message=self.system_prompt,
-            memory=[self.events, self.thoughts],
-            tools=[self.add_internal_thought],
-        )
+        agent = await self.get_agent("reflect", transcript, tools=[self.add_internal_thought])
         await agent.run(
             task="HOST: discussion has ended. Please reflect on the discussion and summarise things that stood out, suspicions of other players or potential strategies and record them to your memory."
         )
 
+    def start_round(self, round: int):
+        """Move the player's memories on to a new round of the game."""
+        self.round = round
+        for memory in (self.events, self.thoughts):
+            if isinstance(memory, RoundWindowMemory):
+                memory.start_round(round)
+
+    async def remember(self, memory_name: str, content: MemoryContent):
+        """Add an entry to one of the player's memories ("events" or "thoughts")."""
+        await getattr(self, memory_name).add(content)
+        self.memory_log.append((memory_name, content))
+
+    async def restore_memories(self, entries: list[tuple[str, MemoryContent]]):
+        """Add checkpointed memory entries back, reusing any a persisted memory already holds.
+
+        A persisted memory may hold entries added after the checkpoint was taken; they're dropped, as the game
+        replays the phases that added them.
+        """
+        held = {"events": 0, "thoughts": 0}
+        for name in held:
+            memory = getattr(self, name)
+            if isinstance(memory, VectorMemory):
+                memory.truncate(sum(1 for n, _ in entries if n == name))
+                held[name] = len(memory)
+        for name, content in entries:
+            if held[name] > 0:
+                held[name] -= 1
+                self.memory_log.append((name, content))
+            else:
+                await self.remember(name, content)
+
     async def remember_event(self, event: str, round: int):
         """Add a game event to the player's memory."""
         content = MemoryContent(
             content=event, mime_type=MemoryMimeType.TEXT, metadata={"type": "event", "round": round}
         )
-        await self.events.add(content)
+        await self.remember("events", content)
 
-    async def add_internal_thought(self, content: str, round: int):
+    async def add_internal_thought(self, content: str):
         """Add an internal thought to the agent's memory."""
         content = MemoryContent(
-            content=content, mime_type=MemoryMimeType.TEXT, metadata={"type": "thought", "round": round}
+            content=content, mime_type=MemoryMimeType.TEXT, metadata={"type": "thought", "round": self.round}
         )
-        await self.thoughts.add(content)
+        await self.remember("thoughts", content)
@@ -0,0 +1,53 @@
+import importlib
+from typing import Optional
+
+# Role name -> (module, class), imported only when a deck is dealt so that checking one stays cheap
+ROLE_CLASSES = {
+    "villager": ("roles.villager", "Villager"),
+    "werewolf": ("roles.werewolf", "Werewolf"),
+    "seer": ("roles.seer", "Seer"),
+}
+
+DEFAULT_ROLES = ["villager", "villager", "villager", "werewolf", "seer"]
+
+# With fewer players, the first elimination always ends the game
+MIN_PLAYERS = 3
+
+
+def default_roles(players: int) -> list[str]:
+    """One werewolf per five players and a seer, the rest villagers."""
+    werewolves = max(1, players // 5)
+    return ["werewolf"] * werewolves + ["seer"] + ["villager"] * (players - werewolves - 1)
+
+
+def parse_roles(value: str) -> list[str]:
+    """Parse a comma-separated list of roles, e.g. "villager,villager,werewolf"."""
+    return [r.strip().lower() for r in value.split(",") if r.strip()]
+
+
+def validate_roles(roles: list[str], players: Optional[int] = None):
+    """Raise a ValueError if the roles don't make a playable game (for the given number of players, if any)."""
+    unknown = sorted(set(r for r in roles if r not in ROLE_CLASSES))
+    if unknown:
+        raise ValueError(f"Unknown role(s): {', '.join(unknown)} (choose from {', '.join(ROLE_CLASSES)})")
+    if players is not None and len(roles) != players:
+        raise ValueError(f"{len(roles)} roles were given for {players} players")
+    if len(roles) < MIN_PLAYERS:
+        raise ValueError(f"At least {MIN_PLAYERS} players are needed, got {len(roles)}")
+
+    werewolves = roles.count("werewolf")
+    if werewolves == 0:
+        raise ValueError("At least one werewolf is needed")
+    if werewolves >= len(roles) - werewolves:
+        raise ValueError(f"{werewolves} werewolves would already match the {len(roles) - werewolves} villagers")
+    if roles.count("seer") > 1:
+        raise ValueError("There can only be one seer")
+
+
+def role_classes(roles: list[str]) -> list[type]:
+    """The role classes to deal for the given role names."""
+    classes = {}
+    for name in set(roles):
+        module, attribute = ROLE_CLASSES[name]
+        classes[name] = getattr(importlib.import_module(module), attribute)
+    return [classes[r] for r in roles]
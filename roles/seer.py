@@ -1,19 +1,56 @@
-from autogen_agentchat.agents import AssistantAgent
+import asyncio
+from typing import Optional
+
 from autogen_core.memory import MemoryContent, MemoryMimeType
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 
+from game_log import SEER_REVEAL
 from models.seer_choice_response import SeerChoiceResponse
+from roles._night_action import NightAction
 from roles._role import Role
-from ui.message_handler import MessageHandler
+from ui.base_message_handler import BaseMessageHandler
+
+
+class SeerVision(NightAction):
+    """The seer chooses a player while the werewolves deliberate, and learns their role once the kill is resolved.
+
+    The seer sees the players as they were when the night began, so they can still learn the role of the player the
+    werewolves kill that night. A seer who is killed learns nothing.
+    """
+
+    order = 60
+
+    async def decide(self, game, players: list[Role]) -> list[tuple[Role, SeerChoiceResponse, str]]:
+        async def choose(seer: "Seer") -> tuple[Role, SeerChoiceResponse, str]:
+            return (seer, *await seer.choose_player_to_see())
+
+        self.players_at_nightfall = list(game.players)
+        return await asyncio.gather(*[choose(seer) for seer in players])
+
+    async def resolve(self, game, players: list[Role], decision: list[tuple[Role, SeerChoiceResponse, str]]):
+        for seer, choice, response in decision:
+            if seer not in game.players:
+                continue
+            await game.message_handler.send_message("*** Seer, wake up... ***")
+            await game.message_handler.send_message(response, f"player_{seer.id}")
+            if await seer.see_player(choice, self.players_at_nightfall):
+                game.events.record(game.round, "night", SEER_REVEAL, seer.id, choice.player_to_see)
 
 
 class Seer(Role):
     """Seer player class."""
 
-    def __init__(self, model_config: dict[str, str], message_handler: MessageHandler, id: int):
-        super().__init__(model_config, message_handler, id)
+    night_action = SeerVision
+
+    def __init__(
+        self,
+        model_config: dict[str, str],
+        message_handler: BaseMessageHandler,
+        id: int,
+        memory_path: Optional[str] = None,
+    ):
+        super().__init__(model_config, message_handler, id, memory_path)
         self.role = "seer"
-        self.system_prompt += """
+        self.role_prompt += """
         You've checked your card and found out that you have the role of: seer.
 
         Tips:
@@ -21,24 +58,27 @@ class Seer(Role):
         - Carefully consider the right time to reveal your role and knowledge - it might help but will make you a target for the werewolves
         """
 
-    async def see_another_player(self, players: list[Role]):
-        """Choose and see another player's role"""
-        model_client = AzureOpenAIChatCompletionClient(response_format=SeerChoiceResponse, **self.model_config)
-        agent = AssistantAgent(
-            name=f"player_{self.id}",
-            model_client=model_client,
-            system_message=self.system_prompt,
-            memory=[self.events, self.thoughts],
+    async def choose_player_to_see(self) -> tuple[SeerChoiceResponse, str]:
+        """Choose another player to see the role of, returning the choice and the raw response"""
+        agent = await self.get_agent("seer", client_args={"response_format": SeerChoiceResponse})
+        result = await agent.run(
+            task="HOST: Seer, wake up. Choose a player you'd like to see the role of and provide a brief reason why."
         )
-        result = await self.message_handler.send_message_stream(
-            agent.run_stream(
-                task="HOST: Seer, wake up. Choose a player you'd like to see the role of and provide a brief reason why."
+        return SeerChoiceResponse.model_validate_json(result.messages[-1].content), result.messages[-1].content
+
+    async def see_player(self, choice: SeerChoiceResponse, players: list[Role]) -> bool:
+        """See the chosen player's role and remember it, returning whether there was anyone to see"""
+        chosen_player = next((p for p in players if p.id == choice.player_to_see), None)
+        if chosen_player is None:
+            # The model can pick someone who has already been eliminated (or doesn't exist), which reveals nothing
+            content = MemoryContent(
+                content=f"HOST: You chose to see Player {choice.player_to_see}'s role, but they are no longer in the game.",
+                mime_type=MemoryMimeType.TEXT,
             )
-        )
-        choice = SeerChoiceResponse.model_validate_json(result.messages[-1].content)
-        chosen_player = next(p for p in players if p.id == choice.player_to_see)
-        content = MemoryContent(
-            content=f"HOST: You chose to see Player {chosen_player.id}'s role because {choice.reason}. They are a {chosen_player.role}.",
-            mime_type=MemoryMimeType.TEXT,
-        )
-        await self.events.add(content)
+        else:
+            content = MemoryContent(
+                content=f"HOST: You chose to see Player {chosen_player.id}'s role because {choice.reason}. They are a {chosen_player.role}.",
+                mime_type=MemoryMimeType.TEXT,
+            )
+        await self.remember("events", content)
+        return chosen_player is not None
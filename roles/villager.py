@@ -1,14 +1,22 @@
+from typing import Optional
+
 from roles._role import Role
-from ui.message_handler import MessageHandler
+from ui.base_message_handler import BaseMessageHandler
 
 
 class Villager(Role):
     """Villager player class."""
 
-    def __init__(self, model_config: dict[str, str], message_handler: MessageHandler, id: int):
-        super().__init__(model_config, message_handler, id)
+    def __init__(
+        self,
+        model_config: dict[str, str],
+        message_handler: BaseMessageHandler,
+        id: int,
+        memory_path: Optional[str] = None,
+    ):
+        super().__init__(model_config, message_handler, id, memory_path)
         self.role = "villager"
-        self.system_prompt += """
+        self.role_prompt += """
         You've checked your card and found out that you have the role of: villager.
 
         Tips:
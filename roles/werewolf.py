@@ -1,14 +1,48 @@
+from typing import TYPE_CHECKING, Optional
+
+from roles._night_action import NightAction
 from roles._role import Role
-from ui.message_handler import MessageHandler
+from ui.base_message_handler import BaseMessageHandler
+
+if TYPE_CHECKING:
+    from game import EliminationVote
+
+
+class WerewolfKill(NightAction):
+    """The werewolves discuss and vote on which villager to kill. Their votes are recorded and announced, and the
+    villager eliminated, when the action resolves."""
+
+    order = 50
+
+    async def decide(self, game, players: list[Role]) -> "EliminationVote":
+        await game.message_handler.send_message("*** Werewolves, wake up... ***")
+        villagers = [v.id for v in game.players if v.role != "werewolf"]
+        task = f"HOST: The night phase has now begun. The villagers are asleep. Werewolves, wake up. You must now decide which villager to kill! The villagers remaining are Player {', Player '.join([str(v) for v in villagers])}."
+        if len(players) > 1:
+            task += f" The werewolves remaining are Player {', Player '.join([str(w.id) for w in players])}). You may now discuss your strategy with each other."
+        else:
+            task += " You are the only remaining werewolf. You may now reflect on your strategy and consider which players might be a threat to you."
+        return await game.decide_elimination(task, players, phase="night", targets=villagers)
+
+    async def resolve(self, game, players: list[Role], decision: "EliminationVote"):
+        await game.eliminate(await game.apply_vote(decision), "night")
 
 
 class Werewolf(Role):
     """Werewolf player class."""
 
-    def __init__(self, model_config: dict[str, str], message_handler: MessageHandler, id: int):
-        super().__init__(model_config, message_handler, id)
+    night_action = WerewolfKill
+
+    def __init__(
+        self,
+        model_config: dict[str, str],
+        message_handler: BaseMessageHandler,
+        id: int,
+        memory_path: Optional[str] = None,
+    ):
+        super().__init__(model_config, message_handler, id, memory_path)
         self.role = "werewolf"
-        self.system_prompt += """
+        self.role_prompt += """
         You've checked your card and found out that you have the role of: werewolf.
 
         Tips:
@@ -0,0 +1,348 @@
+"""Headless runner for playing many games of Werewolf in parallel, without Chainlit.
+
+Games run concurrently on an asyncio loop inside each worker process, and across cores in a process pool.
+Each game gets its own seed (for the role shuffle and vote tie-breaks) and produces one result record.
+
+Usage:
+    python simulation.py --games 1000 --processes 8 --concurrency 16 --output results.jsonl
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, replace
+from typing import Optional
+
+from clients.client_pool import client_pool
+from checkpoint import GameCheckpointer
+from clients.request_scheduler import RequestScheduler
+from clients.model_router import CALL_TYPES, ModelRouter
+from clients.response_cache import ResponseCache
+from discussion import DiscussionLimits
+from game import WerewolfGame
+from game_log import GameLog
+from roles._role import Role
+from roles.deck import DEFAULT_ROLES, parse_roles, role_classes, validate_roles
+from telemetry import recorder
+from ui.headless_message_handler import JsonlMessageHandler, NullMessageHandler
+from utils import configure_logging
+
+
+@dataclass
+class SimulationOptions:
+    """Settings shared by every game in a simulation (must be picklable to reach the worker processes)."""
+
+    roles: list[str]
+    concurrency: int = 8
+    events_dir: Optional[str] = None
+    checkpoint_dir: Optional[str] = None
+    telemetry_dir: Optional[str] = None
+    game_log_dir: Optional[str] = None
+    client_factory: Optional[str] = None
+    cache_path: Optional[str] = None
+    cache_mode: str = "fallthrough"
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    memory_backend: str = Role.memory_backend
+    memory_summariser: str = Role.memory_summariser
+    memory_dir: Optional[str] = None
+    # Call type -> deployment to serve it from, instead of the default deployment
+    routes: Optional[dict[str, str]] = None
+    discussion: str = "auto"
+    breakout_group_size: int = 5
+    ready_quorum: float = 1.0
+    max_turns_per_player: Optional[int] = None
+    max_discussion_tokens: Optional[int] = None
+    speculative_votes: bool = False
+    verbose: bool = False
+
+
+@dataclass
+class GameResult:
+    """The outcome of a single headless game."""
+
+    game: int
+    seed: int
+    winner: Optional[str]
+    rounds: int
+    roles: dict[int, str]
+    eliminated_players: list[int]
+    duration_seconds: float
+    error: Optional[str] = None
+
+
+def load_client_factory(path: str):
+    """Import a model client factory given as `module:attribute`."""
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+async def play_game(
+    game_index: int,
+    seed: int,
+    model_config: dict[str, str],
+    options: SimulationOptions,
+    game_log: Optional[GameLog] = None,
+) -> Optional[GameResult]:
+    """Play one game to completion (resuming it from its checkpoint if there is one) and summarise the outcome.
+
+    Returns None for a game whose checkpoint shows it already finished, as its result was recorded back then.
+    """
+    if options.events_dir:
+        message_handler = JsonlMessageHandler(
+            os.path.join(options.events_dir, f"game_{game_index}.jsonl"), str(game_index)
+        )
+    else:
+        message_handler = NullMessageHandler()
+
+    checkpointer = None
+    if options.checkpoint_dir:
+        checkpointer = GameCheckpointer(os.path.join(options.checkpoint_dir, f"game_{game_index}"))
+
+    discussion_args = {
+        "discussion": options.discussion,
+        "breakout_group_size": options.breakout_group_size,
+        "discussion_limits": DiscussionLimits(
+            ready_quorum=options.ready_quorum,
+            max_turns_per_player=options.max_turns_per_player,
+            max_tokens=options.max_discussion_tokens,
+        ),
+        "game_log": game_log,
+        "speculative_votes": options.speculative_votes,
+        "memory_dir": options.memory_dir,
+    }
+    if checkpointer is not None and checkpointer.exists:
+        game = await WerewolfGame.resume(model_config, message_handler, checkpointer, **discussion_args)
+        if game.game_over:
+            await message_handler.close()
+            return None
+    else:
+        game = WerewolfGame(
+            model_config,
+            message_handler,
+            role_classes(options.roles),
+            seed=seed,
+            checkpointer=checkpointer,
+            game_id=f"game_{game_index}",
+            **discussion_args,
+        )
+
+    error = None
+    start = time.perf_counter()
+    try:
+        await game.run()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        await message_handler.close()
+
+    return GameResult(
+        game=game_index,
+        seed=seed,
+        winner=game.winner,
+        rounds=game.round,
+        roles=game.dealt_roles,
+        eliminated_players=game.eliminated_players,
+        duration_seconds=time.perf_counter() - start,
+        error=error,
+    )
+
+
+async def play_games(
+    games: list[tuple[int, int]],
+    model_config: dict[str, str],
+    options: SimulationOptions,
+    game_log: Optional[GameLog] = None,
+) -> list[GameResult]:
+    """Play the given (game index, seed) pairs concurrently on the current event loop, skipping finished games."""
+    semaphore = asyncio.Semaphore(options.concurrency)
+
+    async def play(game_index: int, seed: int) -> Optional[GameResult]:
+        async with semaphore:
+            return await play_game(game_index, seed, model_config, options, game_log)
+
+    try:
+        results = await asyncio.gather(*[play(i, s) for i, s in games])
+        return [r for r in results if r is not None]
+    finally:
+        await client_pool.close()
+
+
+def _run_worker(games: list[tuple[int, int]], options: SimulationOptions) -> list[dict]:
+    """Entry point for a worker process: play a chunk of games and return their results as dicts."""
+    configure_logging(logging.INFO if options.verbose else logging.WARNING)
+    Role.memory_backend = options.memory_backend
+    Role.memory_summariser = options.memory_summariser
+    recorder.output_dir = options.telemetry_dir
+    if options.cache_path and client_pool.cache is None:
+        client_pool.cache = ResponseCache(options.cache_path, mode=options.cache_mode)
+    if options.requests_per_minute or options.tokens_per_minute:
+        client_pool.scheduler = RequestScheduler(
+            requests_per_minute=options.requests_per_minute or 600,
+            tokens_per_minute=options.tokens_per_minute or 100_000,
+        )
+    if options.routes:
+        client_pool.router = ModelRouter(
+            {call_type: {"azure_deployment": d, "model": d} for call_type, d in options.routes.items()}
+        )
+    if options.client_factory:
+        client_pool.client_factory = load_client_factory(options.client_factory)
+        model_config = {}
+    else:
+        from config import load_model_config, load_model_router
+
+        model_config = load_model_config()
+        client_pool.router = client_pool.router or load_model_router()
+    # Each worker process appends to its own shard of the game log
+    game_log = GameLog(options.game_log_dir) if options.game_log_dir else None
+
+    with contextlib.ExitStack() as stack:
+        if not options.verbose:
+            # The game prints roles and vote tallies as it goes, which is just noise across thousands of games
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        results = asyncio.run(play_games(games, model_config, options, game_log))
+
+    return [asdict(r) for r in results]
+
+
+def run_simulation(
+    n_games: int, options: SimulationOptions, output: str, base_seed: int = 0, processes: int = os.cpu_count() or 1
+):
+    """Play `n_games` across a process pool and append one JSONL result record per game to `output`."""
+    for directory in (options.events_dir, options.checkpoint_dir):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # Each worker process schedules its own model calls, so split the deployment's quota between them
+    options = replace(
+        options,
+        requests_per_minute=options.requests_per_minute and options.requests_per_minute / processes,
+        tokens_per_minute=options.tokens_per_minute and options.tokens_per_minute / processes,
+    )
+
+    games = [(i, base_seed + i) for i in range(n_games)]
+    chunk_size = max(1, options.concurrency * 4)
+    chunks = [games[i : i + chunk_size] for i in range(0, len(games), chunk_size)]
+
+    start = time.perf_counter()
+    completed = 0
+    with ProcessPoolExecutor(max_workers=processes) as executor, open(output, "a", encoding="utf-8") as f:
+        futures = {executor.submit(_run_worker, chunk, options): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            for result in future.result():
+                f.write(json.dumps(result) + "\n")
+            # Including any games that had already finished (whose results were written by an earlier run)
+            completed += len(futures[future])
+            f.flush()
+            print(f"{completed}/{n_games} games complete")
+
+    elapsed = time.perf_counter() - start
+    print(f"Played {n_games} games in {elapsed:.1f}s ({n_games / elapsed:.2f} games/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play games of Werewolf headlessly and in parallel.")
+    parser.add_argument("--games", type=int, default=10, help="Number of games to play")
+    parser.add_argument("--roles", default=",".join(DEFAULT_ROLES), help="Comma-separated roles to deal each game")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the first game (game i uses seed + i)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent games per process")
+    parser.add_argument("--output", default="results.jsonl", help="JSONL file to append game results to")
+    parser.add_argument("--events-dir", help="Directory to write each game's event log to (omit to discard)")
+    parser.add_argument("--checkpoint-dir", help="Directory to checkpoint games to, resuming any found there")
+    parser.add_argument("--telemetry-dir", help="Directory to export each game's model call and phase spans to")
+    parser.add_argument(
+        "--game-log-dir", help="Directory to append every game's columnar event log to, for analytics.py"
+    )
+    parser.add_argument(
+        "--client-factory", help="Model client factory as module:attribute, e.g. a local stand-in for Azure OpenAI"
+    )
+    parser.add_argument("--cache", help="SQLite file to record model responses to / replay them from")
+    parser.add_argument(
+        "--cache-mode", choices=["record", "replay", "fallthrough"], default="fallthrough", help="Response cache mode"
+    )
+    parser.add_argument("--rpm", type=float, help="Deployment requests/min quota to schedule model calls within")
+    parser.add_argument("--tpm", type=float, help="Deployment tokens/min quota to schedule model calls within")
+    parser.add_argument(
+        "--memory-backend", choices=["round_window", "vector"], default=Role.memory_backend, help="Player memory"
+    )
+    parser.add_argument(
+        "--memory-summariser",
+        choices=["extractive", "model"],
+        default=Role.memory_summariser,
+        help="How older rounds are summarised in round_window memory",
+    )
+    parser.add_argument("--memory-dir", help="Directory to persist vector memory indexes to, one directory per game")
+    parser.add_argument(
+        "--route",
+        action="append",
+        default=[],
+        metavar="CALL_TYPE=DEPLOYMENT",
+        help=f"Serve a call type ({', '.join(CALL_TYPES)}) from another deployment (repeatable)",
+    )
+    parser.add_argument(
+        "--discussion",
+        choices=["auto", "swarm", "breakout"],
+        default="auto",
+        help="Discuss in one Swarm, in parallel breakout groups, or in groups only for large tables",
+    )
+    parser.add_argument("--group-size", type=int, default=5, help="Players per breakout group")
+    parser.add_argument(
+        "--ready-quorum", type=float, default=1.0, help="Fraction of players who must be ready to end a discussion"
+    )
+    parser.add_argument("--max-turns", type=int, help="End a discussion once any player has taken this many turns")
+    parser.add_argument("--max-discussion-tokens", type=int, help="End a discussion once it has used this many tokens")
+    parser.add_argument(
+        "--speculative-votes",
+        action="store_true",
+        help="Start each player's vote as soon as they're ready to vote, while the discussion goes on",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Keep the game's console output")
+    args = parser.parse_args()
+
+    roles = parse_roles(args.roles)
+    try:
+        validate_roles(roles)
+    except ValueError as e:
+        parser.error(str(e))
+
+    routes = dict(r.split("=", 1) for r in args.route)
+    unknown = [c for c in routes if c not in CALL_TYPES]
+    if unknown:
+        parser.error(f"Unknown call type(s): {', '.join(unknown)}")
+
+    options = SimulationOptions(
+        roles=roles,
+        concurrency=args.concurrency,
+        events_dir=args.events_dir,
+        checkpoint_dir=args.checkpoint_dir,
+        telemetry_dir=args.telemetry_dir,
+        game_log_dir=args.game_log_dir,
+        client_factory=args.client_factory,
+        cache_path=args.cache,
+        cache_mode=args.cache_mode,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        memory_backend=args.memory_backend,
+        memory_summariser=args.memory_summariser,
+        memory_dir=args.memory_dir,
+        routes=routes or None,
+        discussion=args.discussion,
+        breakout_group_size=args.group_size,
+        ready_quorum=args.ready_quorum,
+        max_turns_per_player=args.max_turns,
+        max_discussion_tokens=args.max_discussion_tokens,
+        speculative_votes=args.speculative_votes,
+        verbose=args.verbose,
+    )
+    run_simulation(args.games, options, args.output, base_seed=args.seed, processes=args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, fields
+from typing import Callable, Optional, Sequence
+
+from autogen_agentchat.base import TerminationCondition
+from autogen_agentchat.messages import AgentEvent, ChatMessage, StopMessage
+from autogen_core.models import LLMMessage
+
+from discussion import player_messages
+from models.agent_vote_response import AgentVoteResponse
+from prompts import Transcript
+from roles._role import Role
+
+logger = logging.getLogger(__name__)
+
+PLAYER_MENTION = re.compile(r"\bplayer[ _]?(\d+)", re.IGNORECASE)
+
+
+def names_a_player(message: LLMMessage, voter: Role) -> bool:
+    """Whether a message could change a player's vote: someone else naming a player (small talk and the voter's own
+    messages don't).
+    """
+    return message.source != f"player_{voter.id}" and PLAYER_MENTION.search(str(message.content)) is not None
+
+
+@dataclass
+class SpeculationStats:
+    """How speculative votes fared: started, kept as they were, or thrown away and generated again."""
+
+    started: int = 0
+    kept: int = 0
+    # Regenerated while the discussion was still going, because of what was said after they were started
+    regenerated: int = 0
+    # Voted again once the discussion ended, because of what was said after they were (last) started
+    redone: int = 0
+
+    def add(self, other: "SpeculationStats"):
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+    def summary(self) -> str:
+        kept = self.kept / self.started if self.started else 0.0
+        return (
+            f"Speculative votes: {self.started} started, {self.kept} kept ({kept:.0%}), {self.redone} redone after "
+            f"the discussion, {self.regenerated} regenerated during it"
+        )
+
+
+class SpeculativeVotes(TerminationCondition):
+    """Generates players' votes in the background once they've said they're ready to vote, while the rest of the
+    discussion goes on, so that the vote's latency hides behind the discussion's tail.
+
+    Pass `ready` as the `on_ready` callback of the discussion's `TextMentionFromAllTermination`, and add this to the
+    discussion's termination condition (with `|`) so it sees every message; it never ends the discussion itself. A
+    ready player's vote starts once this has seen the batch of messages they said it in, so it sees their own
+    message and everything said alongside it. When
+    someone says something that could change a ready player's vote (by default, another player naming a player), the
+    player's vote is cancelled and started again on the transcript so far. `vote` then hands out the speculative vote
+    if nothing like that was said after it was started, or has the player vote again on the whole transcript.
+    """
+
+    def __init__(
+        self,
+        participants: list[Role],
+        is_material: Callable[[LLMMessage, Role], bool] = names_a_player,
+    ):
+        self.is_material = is_material
+        self.stats = SpeculationStats()
+        self._players = {f"player_{p.id}": p for p in participants}
+        # What the players have said so far
+        self._messages: list[LLMMessage] = []
+        # Players (agent names) who are ready to vote, but whose votes haven't started yet
+        self._ready: list[str] = []
+        # Player (agent name) -> how many messages their speculative vote saw, and the task generating it
+        self._votes: dict[str, tuple[int, asyncio.Task[AgentVoteResponse]]] = {}
+
+    @property
+    def terminated(self) -> bool:
+        return False
+
+    def ready(self, source: str):
+        """Start generating a player's vote (once the messages so far are in), given the agent name of a player who's
+        said they're ready to vote."""
+        if source in self._players and source not in self._votes and source not in self._ready:
+            self._ready.append(source)
+
+    def _start(self, source: str):
+        previous = self._votes.get(source)
+        task = asyncio.create_task(
+            self._vote(self._players[source], Transcript(self._messages), previous[1] if previous else None)
+        )
+        self._votes[source] = (len(self._messages), task)
+
+    @staticmethod
+    async def _vote(
+        player: Role, transcript: Transcript, previous: Optional[asyncio.Task[AgentVoteResponse]]
+    ) -> AgentVoteResponse:
+        if previous is not None:
+            # The player's vote agent is reused, so let the vote being replaced finish unwinding before starting again
+            previous.cancel()
+            await asyncio.wait([previous])
+        return await player.make_vote(transcript)
+
+    def _changed_since(self, source: str, seen: int) -> bool:
+        player = self._players[source]
+        return any(self.is_material(m, player) for m in self._messages[seen:])
+
+    async def __call__(self, messages: Sequence[AgentEvent | ChatMessage]) -> StopMessage | None:
+        self._messages.extend(player_messages(messages))
+        for source, (seen, _) in list(self._votes.items()):
+            if self._changed_since(source, seen):
+                self.stats.regenerated += 1
+                self._start(source)
+        # Players who became ready in this batch (or, if this saw the batch first, an earlier one)
+        for source in self._ready:
+            self.stats.started += 1
+            self._start(source)
+        self._ready.clear()
+        return None
+
+    async def reset(self) -> None:
+        # The team resets its termination condition when the discussion ends, which is when the votes are wanted
+        pass
+
+    async def vote(self, player: Role, transcript: Transcript) -> AgentVoteResponse:
+        """The player's vote on the discussion's transcript: their speculative vote if it's still good, otherwise
+        a new one."""
+        source = f"player_{player.id}"
+        speculation = self._votes.pop(source, None)
+        if speculation is None:
+            return await player.make_vote(transcript)
+
+        seen, task = speculation
+        if not self._changed_since(source, seen):
+            try:
+                vote = await task
+                self.stats.kept += 1
+                return vote
+            except Exception as e:
+                logger.warning("Player %d's speculative vote failed (%r), voting again", player.id, e)
+        else:
+            task.cancel()
+            await asyncio.wait([task])
+        self.stats.redone += 1
+        return await player.make_vote(transcript)
+
+    async def cancel(self):
+        """Cancel any speculative votes that weren't handed out, and wait for them to finish unwinding."""
+        tasks = [task for _, task in self._votes.values()]
+        self._votes.clear()
+        self._ready.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,203 @@
+import json
+import os
+import secrets
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Optional
+
+# Tags (game, round, phase) applied to every span recorded in the current asyncio context
+_call_tags: ContextVar[dict[str, Any]] = ContextVar("call_tags", default={})
+# Counters for the model call currently being made in this context (e.g. retries made by the scheduler)
+_current_call: ContextVar[Optional["Span"]] = ContextVar("current_call", default=None)
+# Counts noted before the next model call in this context starts (e.g. by memories updating its prompt)
+_next_call: ContextVar[dict[str, int]] = ContextVar("next_call", default={})
+
+
+def set_call_tags(**tags: Any):
+    """Tag every span recorded from here on in the current context (and tasks started from it)."""
+    _call_tags.set({**_call_tags.get(), **tags})
+
+
+def get_call_tags() -> dict[str, Any]:
+    return _call_tags.get()
+
+
+def count_retry():
+    """Note a retry against the model call in progress, if one is being recorded."""
+    span = _current_call.get()
+    if span is not None:
+        span.attributes["retries"] = span.attributes.get("retries", 0) + 1
+
+
+def count_for_next_call(**counts: int):
+    """Add counts to the next model call recorded in the current context, for work done while preparing it."""
+    pending = dict(_next_call.get())
+    for key, value in counts.items():
+        pending[key] = pending.get(key, 0) + value
+    _next_call.set(pending)
+
+
+@dataclass
+class Span:
+    """A timed operation (a model call or a game phase) with its tags and measurements."""
+
+    name: str
+    start: float
+    end: Optional[float] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    trace_id: str = ""
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+
+    @property
+    def duration(self) -> float:
+        return (self.end or self.start) - self.start
+
+
+class TelemetryRecorder:
+    """Collects spans for every model call and phase, grouped by game, and exports them when the game ends.
+
+    Each game's spans are written to `<output_dir>/<game>.jsonl` (one span per line) and, in OTLP JSON form, to
+    `<output_dir>/<game>.otlp.json` so they can be loaded into any OpenTelemetry tooling.
+    """
+
+    def __init__(self, output_dir: Optional[str] = None):
+        self.output_dir = output_dir
+        self._spans: dict[str, list[Span]] = defaultdict(list)
+        self._trace_ids: dict[str, str] = {}
+        # Called with each game's id and spans when it finishes, e.g. to analyse them without going via the files
+        self.finish_hooks: list[Callable[[str, list[Span]], None]] = []
+        # When the first model call started and when the first one finished (epoch seconds), for measuring cold start
+        self.first_call_at: Optional[float] = None
+        self.first_response_at: Optional[float] = None
+
+    def start_span(self, name: str, **attributes: Any) -> Span:
+        tags = get_call_tags()
+        game = str(tags.get("game", "unknown"))
+        trace_id = self._trace_ids.setdefault(game, secrets.token_hex(16))
+        span = Span(name=name, start=time.time(), attributes={**tags, **attributes}, trace_id=trace_id)
+        self._spans[game].append(span)
+        return span
+
+    def start_call(self, **attributes: Any) -> tuple[Span, Any]:
+        """Start a model call span and make it the current call (for retry counting)."""
+        span = self.start_span("model_call", retries=0, **_next_call.get(), **attributes)
+        _next_call.set({})
+        if self.first_call_at is None:
+            self.first_call_at = span.start
+        return span, _current_call.set(span)
+
+    def end_call(self, span: Span, token: Any):
+        span.end = time.time()
+        if self.first_response_at is None:
+            self.first_response_at = span.end
+        try:
+            _current_call.reset(token)
+        except ValueError:
+            # A stream that's closed from another context (e.g. when it's garbage collected) can't reset it
+            pass
+
+    def summary(self, game: str) -> str:
+        """A report of where the game's time and tokens went, by phase and call type, and by player."""
+        calls = [s for s in self._spans.get(game, []) if s.name == "model_call"]
+        phases = [s for s in self._spans.get(game, []) if s.name == "phase"]
+        if not calls:
+            return f"Telemetry for game {game}: no model calls recorded"
+
+        by_type: dict[tuple, list[Span]] = defaultdict(list)
+        by_player: dict[Any, list[Span]] = defaultdict(list)
+        for span in calls:
+            by_type[(span.attributes.get("phase"), span.attributes.get("call_type"))].append(span)
+            by_player[span.attributes.get("player")].append(span)
+
+        def tokens(spans: list[Span], kind: str) -> int:
+            return sum(s.attributes.get(kind, 0) for s in spans)
+
+        def cached_ratio(spans: list[Span]) -> float:
+            prompt_tokens = tokens(spans, "prompt_tokens")
+            return min(1.0, tokens(spans, "estimated_cached_prompt_tokens") / prompt_tokens) if prompt_tokens else 0.0
+
+        lines = [f"Telemetry for game {game}: {len(calls)} model calls over {len(phases)} phases"]
+        lines.append(
+            f"  {'phase':<8}{'call type':<12}{'calls':>7}{'wall s':>9}{'avg s':>8}{'avg ttft':>10}"
+            f"{'prompt tok':>12}{'~cached %':>10}{'compl tok':>11}{'memory tok':>12}{'retries':>9}"
+        )
+        for (phase, call_type), spans in sorted(by_type.items(), key=lambda item: str(item[0])):
+            ttfts = [s.attributes["ttft"] for s in spans if s.attributes.get("ttft") is not None]
+            lines.append(
+                f"  {str(phase):<8}{str(call_type):<12}{len(spans):>7}{sum(s.duration for s in spans):>9.1f}"
+                f"{sum(s.duration for s in spans) / len(spans):>8.2f}"
+                f"{(sum(ttfts) / len(ttfts) if ttfts else 0):>10.2f}"
+                f"{tokens(spans, 'prompt_tokens'):>12}{cached_ratio(spans):>10.0%}"
+                f"{tokens(spans, 'completion_tokens'):>11}"
+                f"{tokens(spans, 'memory_tokens'):>12}{tokens(spans, 'retries'):>9}"
+            )
+        lines.append(
+            "  Tokens by player: "
+            + ", ".join(
+                f"Player {player}: {tokens(spans, 'prompt_tokens') + tokens(spans, 'completion_tokens')}"
+                for player, spans in sorted(by_player.items(), key=lambda item: str(item[0]))
+            )
+        )
+        lines.append(f"  Prompt tokens the prompt cache could serve (estimated): ~{cached_ratio(calls):.0%}")
+        if any("memory_tokens_saved" in s.attributes for s in calls):
+            lines.append(f"  Memory compaction saved ~{tokens(calls, 'memory_tokens_saved')} prompt tokens")
+        return "\n".join(lines)
+
+    def _to_otlp(self, spans: list[Span]) -> dict[str, Any]:
+        def value(v: Any) -> dict[str, Any]:
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "autowolf"}}]},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "autowolf.telemetry"},
+                            "spans": [
+                                {
+                                    "traceId": s.trace_id,
+                                    "spanId": s.span_id,
+                                    "name": s.name,
+                                    "kind": 1,
+                                    "startTimeUnixNano": str(int(s.start * 1e9)),
+                                    "endTimeUnixNano": str(int((s.end or s.start) * 1e9)),
+                                    "attributes": [
+                                        {"key": k, "value": value(v)} for k, v in s.attributes.items() if v is not None
+                                    ],
+                                }
+                                for s in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def finish_game(self, game: str) -> str:
+        """Export the game's spans (if an output directory is set), hand them to the finish hooks, forget them and
+        return the summary report."""
+        report = self.summary(game)
+        spans = self._spans.pop(game, [])
+        self._trace_ids.pop(game, None)
+        for hook in self.finish_hooks:
+            hook(game, spans)
+        if self.output_dir and spans:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(os.path.join(self.output_dir, f"{game}.jsonl"), "w", encoding="utf-8") as f:
+                for span in spans:
+                    f.write(json.dumps({**asdict(span), "duration": span.duration}, default=str) + "\n")
+            with open(os.path.join(self.output_dir, f"{game}.otlp.json"), "w", encoding="utf-8") as f:
+                json.dump(self._to_otlp(spans), f)
+        return report
+
+
+recorder = TelemetryRecorder()
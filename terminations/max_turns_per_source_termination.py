@@ -0,0 +1,76 @@
+from collections import Counter
+from typing import Optional, Sequence
+
+from autogen_agentchat.base import TerminatedException, TerminationCondition
+from autogen_agentchat.messages import AgentEvent, BaseChatMessage, ChatMessage, StopMessage
+from autogen_core import Component
+from pydantic import BaseModel
+from typing_extensions import Self
+
+
+class MaxTurnsPerSourceTerminationConfig(BaseModel):
+    """Configuration for the termination condition to allow for serialization
+    and deserialization of the component.
+    """
+
+    max_turns: int
+    sources: Optional[set[str]] = None
+
+
+class MaxTurnsPerSourceTermination(TerminationCondition, Component[MaxTurnsPerSourceTerminationConfig]):
+    """Terminate the whole conversation as soon as any one source has taken `max_turns` turns.
+
+    This ends the conversation for every agent, not just the one that reached the cap: a termination condition can
+    only stop the team, not take one agent out of it. It stops a couple of agents handing the conversation back and
+    forth between themselves while the rest never get to speak, at the cost of ending the discussion early.
+
+    A turn is a chat message (text or handoff) from the source; events such as tool calls and thoughts aren't
+    counted. If `sources` is given, only those sources' turns count.
+    """
+
+    component_config_schema = MaxTurnsPerSourceTerminationConfig
+    """The schema for the component configuration."""
+
+    def __init__(self, max_turns: int, sources: Optional[set[str]] = None) -> None:
+        self._terminated = False
+        self._max_turns = max_turns
+        self._sources = set(sources) if sources is not None else None
+        self._turns: Counter[str] = Counter()
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages: Sequence[AgentEvent | ChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        for message in messages:
+            if not isinstance(message, BaseChatMessage) or message.source == "user":
+                continue
+            if self._sources is not None and message.source not in self._sources:
+                continue
+            self._turns[message.source] += 1
+            if self._turns[message.source] >= self._max_turns:
+                self._terminated = True
+                return StopMessage(
+                    content=f"Maximum turns reached: {message.source} has taken {self._max_turns} turns",
+                    source="MaxTurnsPerSourceTermination",
+                )
+        return None
+
+    async def reset(self) -> None:
+        self._terminated = False
+        self._turns.clear()
+
+    def _to_config(self) -> MaxTurnsPerSourceTerminationConfig:
+        return MaxTurnsPerSourceTerminationConfig(
+            max_turns=self._max_turns,
+            sources=self._sources,
+        )
+
+    @classmethod
+    def _from_config(cls, config: MaxTurnsPerSourceTerminationConfig) -> Self:
+        return cls(
+            max_turns=config.max_turns,
+            sources=config.sources,
+        )
@@ -1,4 +1,5 @@
-from typing import Sequence
+import math
+from typing import Callable, Optional, Sequence
 
 from autogen_agentchat.base import TerminatedException, TerminationCondition
 from autogen_agentchat.messages import AgentEvent, ChatMessage, StopMessage
@@ -14,19 +15,35 @@ class TextMentionFromAllTerminationConfig(BaseModel):
 
     sources: set[str]
     text: str
+    quorum: float = 1.0
 
 
 class TextMentionFromAllTermination(TerminationCondition, Component[TextMentionFromAllTerminationConfig]):
-    """Terminate the conversation if every specified source says the specified text."""
+    """Terminate the conversation if every specified source says the specified text.
+
+    With a `quorum` below 1, terminate once that fraction of the sources (rounded up) have said it instead.
+    Only the new messages are checked on each call, so the work per message is constant. `on_ready` (if given) is
+    called with each source the first time it says the text, e.g. to start work that only needs that source to be
+    done; it isn't part of the component config.
+    """
 
     component_config_schema = TextMentionFromAllTerminationConfig
     """The schema for the component configuration."""
 
-    def __init__(self, sources: set[str], text: str = "**DONE**") -> None:
+    def __init__(
+        self,
+        sources: set[str],
+        text: str = "**DONE**",
+        quorum: float = 1.0,
+        on_ready: Optional[Callable[[str], None]] = None,
+    ) -> None:
         self._terminated = False
-        self._sources_requesting_termination = set()
-        self._sources = sources
+        self._sources_requesting_termination: set[str] = set()
+        self._sources = set(sources)
         self._termination_text = text
+        self._quorum = quorum
+        self._required = max(1, math.ceil(len(self._sources) * quorum))
+        self._on_ready = on_ready
 
     @property
     def terminated(self) -> bool:
@@ -36,28 +53,46 @@ class TextMentionFromAllTermination(TerminationCondition, Component[TextMentionF
         if self._terminated:
             raise TerminatedException("Termination condition has already been reached")
         for message in messages:
-            if isinstance(message.content, str) and self._termination_text in message.content:
-                if message.source in self._sources:
-                    self._sources_requesting_termination.add(message.source)
-                    if self._sources_requesting_termination == self._sources:
-                        self._terminated = True
-                        return StopMessage(
-                            content=f"Termination condition reached: {self._termination_text} from all sources {self._sources}",
-                            source="TextMentionFromAllTermination",
+            if (
+                message.source in self._sources
+                and message.source not in self._sources_requesting_termination
+                and isinstance(message.content, str)
+                and self._termination_text in message.content
+            ):
+                self._sources_requesting_termination.add(message.source)
+                if self._on_ready is not None:
+                    self._on_ready(message.source)
+                if len(self._sources_requesting_termination) >= self._required:
+                    self._terminated = True
+                    if self._required == len(self._sources):
+                        reason = f"{self._termination_text} from all sources {self._sources}"
+                    else:
+                        reason = (
+                            f"{self._termination_text} from {len(self._sources_requesting_termination)} of "
+                            f"{len(self._sources)} sources (quorum {self._quorum:.0%})"
                         )
+                    return StopMessage(
+                        content=f"Termination condition reached: {reason}",
+                        source="TextMentionFromAllTermination",
+                    )
 
         return None
 
     async def reset(self) -> None:
         self._terminated = False
+        self._sources_requesting_termination.clear()
 
     def _to_config(self) -> TextMentionFromAllTerminationConfig:
         return TextMentionFromAllTerminationConfig(
-            text=self._text,
+            sources=self._sources,
+            text=self._termination_text,
+            quorum=self._quorum,
         )
 
     @classmethod
     def _from_config(cls, config: TextMentionFromAllTerminationConfig) -> Self:
         return cls(
-            _text=config.text,
+            sources=config.sources,
+            text=config.text,
+            quorum=config.quorum,
         )
@@ -0,0 +1,69 @@
+from typing import Sequence
+
+from autogen_agentchat.base import TerminatedException, TerminationCondition
+from autogen_agentchat.messages import AgentEvent, ChatMessage, StopMessage
+from autogen_core import Component
+from pydantic import BaseModel
+from typing_extensions import Self
+
+
+class TokenBudgetTerminationConfig(BaseModel):
+    """Configuration for the termination condition to allow for serialization
+    and deserialization of the component.
+    """
+
+    max_total_tokens: int
+
+
+class TokenBudgetTermination(TerminationCondition, Component[TokenBudgetTerminationConfig]):
+    """Terminate the conversation once the model calls behind its messages have used `max_total_tokens` tokens
+    (prompt and completion) between them.
+
+    Usage is read from each new message's `models_usage` and kept as a running total.
+    """
+
+    component_config_schema = TokenBudgetTerminationConfig
+    """The schema for the component configuration."""
+
+    def __init__(self, max_total_tokens: int) -> None:
+        self._terminated = False
+        self._max_total_tokens = max_total_tokens
+        self._total_tokens = 0
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    @property
+    def total_tokens(self) -> int:
+        return self._total_tokens
+
+    async def __call__(self, messages: Sequence[AgentEvent | ChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        for message in messages:
+            if message.models_usage is not None:
+                self._total_tokens += message.models_usage.prompt_tokens + message.models_usage.completion_tokens
+
+        if self._total_tokens >= self._max_total_tokens:
+            self._terminated = True
+            return StopMessage(
+                content=f"Token budget reached: {self._total_tokens} of {self._max_total_tokens} tokens used",
+                source="TokenBudgetTermination",
+            )
+        return None
+
+    async def reset(self) -> None:
+        self._terminated = False
+        self._total_tokens = 0
+
+    def _to_config(self) -> TokenBudgetTerminationConfig:
+        return TokenBudgetTerminationConfig(
+            max_total_tokens=self._max_total_tokens,
+        )
+
+    @classmethod
+    def _from_config(cls, config: TokenBudgetTerminationConfig) -> Self:
+        return cls(
+            max_total_tokens=config.max_total_tokens,
+        )
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from checkpoint import GameCheckpointer
+from game import WerewolfGame
+from models.agent_vote_response import AgentVoteResponse
+from roles.deck import DEFAULT_ROLES, role_classes
+from ui.headless_message_handler import NullMessageHandler
+
+
+def new_game(tmp_path, **kwargs) -> WerewolfGame:
+    return WerewolfGame(
+        {},
+        NullMessageHandler(),
+        role_classes(DEFAULT_ROLES),
+        seed=3,
+        checkpointer=GameCheckpointer(str(tmp_path / "game")),
+        game_id="test_game",
+        **kwargs,
+    )
+
+
+async def resume(tmp_path) -> WerewolfGame:
+    return await WerewolfGame.resume({}, NullMessageHandler(), GameCheckpointer(str(tmp_path / "game")))
+
+
+async def play_a_day(game: WerewolfGame, eliminated: int):
+    game.checkpointer.save_snapshot(game)
+    await game.announce_event_to_all("HOST: Welcome!")
+    game.next_phase = "day"
+    game.voters = [p.id for p in game.players]
+    game.votes = [AgentVoteResponse(reason="Suspicious.", player_to_eliminate=eliminated) for _ in game.players]
+    await game.eliminate(eliminated)
+    game.next_phase = "night"
+    await game.checkpoint_phase()
+
+
+def test_resuming_restores_the_game_after_the_last_phase(tmp_path):
+    game = new_game(tmp_path)
+    asyncio.run(play_a_day(game, eliminated=2))
+    resumed = asyncio.run(resume(tmp_path))
+
+    assert resumed.game_id == "test_game"
+    assert resumed.seed == 3
+    assert resumed.dealt_roles == game.dealt_roles
+    assert resumed.round == game.round
+    assert resumed.next_phase == "night"
+    assert resumed.eliminated_players == [2]
+    assert [p.id for p in resumed.players] == [p.id for p in game.players]
+    assert [type(p) for p in resumed.players] == [type(p) for p in game.players]
+    assert resumed.events.rows == game.events.rows
+    assert resumed.rng.getstate() == game.rng.getstate()
+    for original, restored in zip(game.players, resumed.players):
+        assert [(name, c.content) for name, c in restored.memory_log] == [
+            (name, c.content) for name, c in original.memory_log
+        ]
+
+
+def test_snapshots_compact_the_log(tmp_path):
+    game = new_game(tmp_path)
+    game.checkpointer.snapshot_every = 1
+    asyncio.run(play_a_day(game, eliminated=2))
+
+    assert (tmp_path / "game.log.jsonl").read_text() == ""
+    resumed = asyncio.run(resume(tmp_path))
+    assert resumed.eliminated_players == [2]
+    assert resumed.events.rows == game.events.rows
+
+
+def test_a_finished_game_is_not_played_or_logged_again(tmp_path):
+    class CountingLog:
+        writes = 0
+
+        def write(self, *args, **kwargs):
+            self.writes += 1
+
+    game = new_game(tmp_path)
+    asyncio.run(play_a_day(game, eliminated=2))
+    game.game_over = True
+    game.winner = "villagers"
+    asyncio.run(game.checkpointer.save_phase(game))
+
+    log = CountingLog()
+    resumed = asyncio.run(
+        WerewolfGame.resume({}, NullMessageHandler(), GameCheckpointer(str(tmp_path / "game")), game_log=log)
+    )
+    assert resumed.game_over
+    assert resumed.winner == "villagers"
+    asyncio.run(resumed.run())
+    assert log.writes == 0
+
+
+def test_loading_without_a_snapshot_fails(tmp_path):
+    (tmp_path / "game.log.jsonl").write_text("")
+    checkpointer = GameCheckpointer(str(tmp_path / "game"))
+    assert checkpointer.exists
+    with pytest.raises(FileNotFoundError):
+        checkpointer.load()
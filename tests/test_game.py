@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from clients.client_pool import client_pool
+from clients.stand_in_client import StandInChatCompletionClient
+from game import EliminationVote, WerewolfGame
+from game_log import ELIMINATION, VOTE
+from roles._night_action import NightAction
+from roles.deck import default_roles, role_classes
+from telemetry import recorder
+from ui.headless_message_handler import NullMessageHandler
+
+
+@pytest.fixture
+def stand_in_client():
+    client_factory = client_pool.client_factory
+    client_pool.client_factory = StandInChatCompletionClient
+    yield
+    asyncio.run(client_pool.close())
+    client_pool.client_factory = client_factory
+
+
+@pytest.mark.parametrize(
+    "players, options",
+    [
+        (5, {"discussion": "swarm"}),
+        (5, {"discussion": "swarm", "speculative_votes": True}),
+        (8, {"discussion": "breakout", "breakout_group_size": 3}),
+    ],
+)
+def test_a_game_plays_to_the_end_with_the_stand_in_client(stand_in_client, players, options):
+    game = WerewolfGame({}, NullMessageHandler(), role_classes(default_roles(players)), seed=1, **options)
+    spans = []
+    recorder.finish_hooks.append(lambda game_id, game_spans: spans.extend(game_spans))
+    try:
+        asyncio.run(game.run())
+    finally:
+        recorder.finish_hooks.pop()
+
+    assert game.game_over
+    assert game.winner in ("villagers", "werewolves")
+    werewolves = {id for id, role in game.dealt_roles.items() if role == "werewolf"}
+    survivors = {p.id for p in game.players}
+    if game.winner == "villagers":
+        assert not werewolves & survivors
+    else:
+        assert werewolves & survivors
+
+    kinds = [row[2] for row in game.events.rows]
+    assert kinds.count(ELIMINATION) == len(game.eliminated_players) == players - len(survivors)
+    assert VOTE in kinds
+    # The game ended in the round of its last elimination, whether that was by day or by night
+    assert game.round == max(round for round, _, kind, _, _ in game.events.rows if kind == ELIMINATION)
+    assert all(target in game.dealt_roles for _, _, _, _, target in game.events.rows)
+    assert any(span.name == "model_call" for span in spans)
+    assert {span.attributes.get("game") for span in spans} == {game.game_id}
+
+
+def test_a_vote_everyone_abstained_from_eliminates_a_random_target(stand_in_client):
+    game = WerewolfGame({}, NullMessageHandler(), role_classes(default_roles(5)), seed=1)
+    werewolves = [p for p in game.players if p.role == "werewolf"]
+    villagers = [p.id for p in game.players if p.role != "werewolf"]
+    vote = EliminationVote("night", werewolves, [None] * len(werewolves), villagers, recorder.start_span("phase"))
+
+    assert asyncio.run(game.apply_vote(vote)) in villagers
+    assert game.votes == []
+
+
+def test_night_actions_finish_deciding_before_a_failure_is_raised(stand_in_client):
+    decided = []
+
+    class Failing(NightAction):
+        async def decide(self, game, players):
+            raise ValueError("no decision")
+
+        async def resolve(self, game, players, decision):
+            pass
+
+    class Slow(Failing):
+        async def decide(self, game, players):
+            await asyncio.sleep(0.05)
+            decided.append(players)
+
+    game = WerewolfGame({}, NullMessageHandler(), role_classes(default_roles(5)), seed=1)
+    for player in game.players:
+        player.night_action = None
+    game.players[0].night_action = Failing
+    game.players[1].night_action = Slow
+
+    with pytest.raises(ValueError):
+        asyncio.run(game.run_night_actions())
+    assert decided == [[game.players[1]]]
@@ -0,0 +1,44 @@
+import numpy as np
+
+from analytics import role_lookup, vote_accuracy
+from game_log import ELIMINATION, EVENT_DTYPE, VOTE, GameEvents, GameLog, GameLogTables, load_game_log
+
+DEALT_ROLES = {1: "villager", 2: "villager", 3: "werewolf", 4: "seer"}
+
+
+def test_games_round_trip_through_the_log(tmp_path):
+    events = GameEvents()
+    events.record(1, "day", VOTE, 1, 3)
+    events.record(1, "day", ELIMINATION, 0, 3)
+    log = GameLog(str(tmp_path), shard="test")
+    assert log.write(DEALT_ROLES, events, rounds=1, winner="villagers", seed=7) == 0
+
+    tables = load_game_log(str(tmp_path))
+    assert len(tables.games) == 1
+    assert tables.games[0]["seed"] == 7
+    assert list(tables.players["player"]) == [1, 2, 3, 4]
+    assert [tuple(row)[3:] for row in tables.events] == [(VOTE, 1, 3), (ELIMINATION, 0, 3)]
+
+
+def test_events_naming_players_who_were_not_dealt_in_are_left_out(tmp_path):
+    events = GameEvents()
+    events.record(1, "day", VOTE, 1, 99)
+    events.record(1, "day", VOTE, 2, -1)
+    events.record(1, "day", VOTE, 4, 3)
+    GameLog(str(tmp_path), shard="test").write(DEALT_ROLES, events, rounds=1, winner="villagers")
+
+    tables = load_game_log(str(tmp_path))
+    assert [(row["actor"], row["target"]) for row in tables.events] == [(4, 3)]
+
+
+def test_vote_accuracy_ignores_players_outside_the_role_lookup(tmp_path):
+    events = GameEvents()
+    GameLog(str(tmp_path), shard="test").write(DEALT_ROLES, events, rounds=1, winner="villagers")
+    tables = load_game_log(str(tmp_path))
+    # As a log written before out of range votes were left out could have them
+    votes = np.array([(0, 1, 0, VOTE, 1, 99), (0, 1, 0, VOTE, 2, 3), (0, 1, 0, VOTE, 77, 3)], dtype=EVENT_DTYPE)
+    tables = GameLogTables(games=tables.games, players=tables.players, events=votes)
+
+    accuracy = vote_accuracy(tables, role_lookup(tables))
+    assert accuracy["villager"] == 0.5
+    assert accuracy["villager team"] == 0.5
@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import pytest
+from autogen_core.models import UserMessage
+
+from clients.request_scheduler import RequestScheduler, ScheduledChatCompletionClient, TokenBucket
+from clients.stand_in_client import StandInChatCompletionClient
+
+MESSAGES = [UserMessage(content="You are Player 1. HOST: start your discussions!", source="host")]
+
+
+class ThrottledError(Exception):
+    status_code = 429
+
+
+class FlakyClient(StandInChatCompletionClient):
+    """Fails its first `failures` calls with the given error, before or after the first streamed chunk."""
+
+    def __init__(self, failures: int, error: Exception = ThrottledError(), after_first_chunk: bool = False):
+        super().__init__()
+        self.failures = failures
+        self.error = error
+        self.after_first_chunk = after_first_chunk
+        self.calls = 0
+
+    def _fail(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+
+    async def create(self, messages, **kwargs):
+        self._fail()
+        return await super().create(messages, **kwargs)
+
+    async def create_stream(self, messages, **kwargs):
+        if not self.after_first_chunk:
+            self._fail()
+        async for chunk in super().create_stream(messages, **kwargs):
+            yield chunk
+            if self.after_first_chunk:
+                self._fail()
+
+
+def scheduler(**kwargs) -> RequestScheduler:
+    return RequestScheduler(base_backoff=0.001, max_backoff=0.001, **kwargs)
+
+
+def test_a_bucket_refills_at_its_rate_up_to_its_capacity():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.seconds_until(60) == 0
+    bucket.take(60)
+    assert bucket.seconds_until(1) == pytest.approx(1, abs=0.05)
+    # More than a full bucket only waits for a full bucket
+    assert bucket.seconds_until(600) == pytest.approx(60, abs=0.05)
+    bucket.drain()
+    assert bucket.available <= 0
+
+
+def test_queued_calls_are_released_in_priority_then_arrival_order():
+    requests = scheduler(requests_per_minute=1200)
+    requests.requests.take(requests.requests.capacity)
+    released = []
+
+    async def call(name: str, priority: int):
+        await requests.acquire(priority, 1)
+        released.append(name)
+
+    async def play():
+        await asyncio.gather(call("reflect", 3), call("vote", 2), call("discussion", 0), call("second vote", 2))
+
+    asyncio.run(play())
+    assert released == ["discussion", "vote", "second vote", "reflect"]
+    assert requests.metrics.queue_depth == 0
+    assert sum(s.requests for s in requests.metrics.waits.values()) == 4
+
+
+def test_calls_wait_for_the_token_limit():
+    requests = scheduler(tokens_per_minute=6000)
+    requests.tokens.take(requests.tokens.capacity)
+
+    async def play():
+        start = time.monotonic()
+        await requests.acquire(0, 10)
+        return time.monotonic() - start
+
+    # 10 tokens at 100 a second
+    assert 0.08 <= asyncio.run(play()) < 1
+
+
+def test_throttled_calls_are_retried():
+    requests = scheduler()
+    client = FlakyClient(failures=2)
+    result = asyncio.run(ScheduledChatCompletionClient(client, requests).create(MESSAGES))
+
+    assert "READY TO VOTE" in result.content
+    assert client.calls == 3
+    assert (requests.metrics.throttled, requests.metrics.retries, requests.metrics.in_flight) == (2, 2, 0)
+
+
+def test_calls_give_up_after_the_maximum_retries():
+    requests = scheduler(max_retries=2)
+    client = FlakyClient(failures=5)
+    with pytest.raises(ThrottledError):
+        asyncio.run(ScheduledChatCompletionClient(client, requests).create(MESSAGES))
+    assert client.calls == 3
+    assert requests.metrics.in_flight == 0
+
+
+def test_other_errors_are_not_retried():
+    requests = scheduler()
+    client = FlakyClient(failures=1, error=ValueError("bad request"))
+    with pytest.raises(ValueError):
+        asyncio.run(ScheduledChatCompletionClient(client, requests).create(MESSAGES))
+    assert client.calls == 1
+    assert requests.metrics.retries == 0
+
+
+def test_streams_are_retried_only_before_their_first_chunk():
+    async def stream(client: FlakyClient, requests: RequestScheduler) -> list:
+        return [chunk async for chunk in ScheduledChatCompletionClient(client, requests).create_stream(MESSAGES)]
+
+    before = FlakyClient(failures=1)
+    chunks = asyncio.run(stream(before, scheduler()))
+    assert before.calls == 2
+    assert chunks
+
+    after = FlakyClient(failures=1, after_first_chunk=True)
+    with pytest.raises(ThrottledError):
+        asyncio.run(stream(after, scheduler()))
+    assert after.calls == 1
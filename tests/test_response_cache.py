@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import pytest
+from autogen_core.models import UserMessage
+
+from clients.response_cache import CacheMissError, CachingChatCompletionClient, ResponseCache
+from clients.stand_in_client import StandInChatCompletionClient
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=100)
+    yield cache
+    cache.close()
+
+
+def keys(cache: ResponseCache) -> list[str]:
+    return [row[0] for row in cache._db.execute("SELECT key FROM responses ORDER BY key")]
+
+
+def test_overwriting_a_response_counts_only_the_new_size(cache):
+    cache.put("a", "x" * 40)
+    cache.put("a", "y" * 30)
+    assert cache._size == 30 == cache._total_size()
+
+
+def test_overwriting_a_response_repeatedly_never_evicts(cache):
+    cache.put("a", "x" * 40)
+    cache.put("b", "x" * 40)
+    for _ in range(5):
+        cache.put("a", "y" * 40)
+    assert keys(cache) == ["a", "b"]
+    assert cache.get("b") == "x" * 40
+
+
+def test_least_recently_used_responses_are_evicted_first(cache):
+    for key in ("a", "b"):
+        cache.put(key, key * 40)
+        time.sleep(0.01)
+    assert cache.get("a") == "a" * 40
+    time.sleep(0.01)
+    cache.put("c", "c" * 40)
+
+    assert keys(cache) == ["a", "c"]
+    assert cache._size == 80 == cache._total_size()
+
+
+def test_the_size_is_read_back_from_the_file(cache, tmp_path):
+    cache.put("a", "x" * 40)
+    reopened = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=100)
+    assert reopened._size == 40
+    reopened.close()
+
+
+def test_responses_are_recorded_then_replayed(tmp_path):
+    messages = [UserMessage(content="You are Player 1. HOST: make your vote", source="host")]
+
+    async def create(mode: str):
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"), mode=mode)
+        client = CachingChatCompletionClient(StandInChatCompletionClient(), cache, {"model": "stand-in"})
+        try:
+            return await client.create(messages), cache
+        finally:
+            cache.close()
+
+    recorded, cache = asyncio.run(create("fallthrough"))
+    assert (cache.hits, cache.misses) == (0, 1)
+    replayed, cache = asyncio.run(create("replay"))
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert replayed.cached
+    assert replayed.content == recorded.content
+
+
+def test_replay_mode_raises_on_a_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), mode="replay")
+    client = CachingChatCompletionClient(StandInChatCompletionClient(), cache, {"model": "stand-in"})
+    with pytest.raises(CacheMissError):
+        asyncio.run(client.create([UserMessage(content="HOST: make your vote", source="host")]))
+    cache.close()
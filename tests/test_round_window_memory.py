@@ -0,0 +1,132 @@
+import asyncio
+
+from autogen_core.memory import MemoryContent, MemoryMimeType
+from autogen_core.models import SystemMessage
+
+from memory.round_window_memory import RoundWindowMemory, estimate_tokens
+from prompts import LayeredChatCompletionContext
+from telemetry import TelemetryRecorder, set_call_tags
+
+
+def entry(text: str, round: int) -> MemoryContent:
+    return MemoryContent(content=text, mime_type=MemoryMimeType.TEXT, metadata={"round": round})
+
+
+def recording_summariser(calls: list[tuple[int, list[str]]]):
+    async def summarise(round: int, entries: list[str]) -> str:
+        calls.append((round, entries))
+        return f"{len(entries)} entries"
+
+    return summarise
+
+
+def contents(memory: RoundWindowMemory) -> list[str]:
+    return [str(c.content) for c in asyncio.run(memory.query()).results]
+
+
+def test_earlier_rounds_are_summarised_once_the_round_moves_on():
+    calls = []
+    memory = RoundWindowMemory("events", summariser=recording_summariser(calls))
+
+    async def play():
+        await memory.add(entry("Player 1 accused Player 2.", 1))
+        await memory.add(entry("Player 2 was eliminated.", 1))
+        memory.start_round(2)
+        await memory.add(entry("Player 3 accused Player 4.", 2))
+        context = LayeredChatCompletionContext("You are Player 1.")
+        await memory.update_context(context)
+        return await context.get_messages()
+
+    messages = asyncio.run(play())
+    assert calls == [(1, ["Player 1 accused Player 2.", "Player 2 was eliminated."])]
+    assert contents(memory) == ["Round 1: 2 entries", "Player 3 accused Player 4."]
+    prompt = "\n".join(str(m.content) for m in messages if isinstance(m, SystemMessage))
+    assert "Round 1: 2 entries" in prompt
+    assert "Player 2 was eliminated." not in prompt
+
+
+def test_a_started_round_is_current_before_it_has_entries():
+    memory = RoundWindowMemory("thoughts", summariser=recording_summariser([]))
+
+    async def play():
+        await memory.add(entry("Player 4 seems quiet.", 1))
+        memory.start_round(2)
+        await memory.update_context(LayeredChatCompletionContext("You are Player 1."))
+
+    asyncio.run(play())
+    assert contents(memory) == ["Round 1: 1 entries"]
+
+
+def test_late_entries_have_their_round_summarised_again():
+    calls = []
+    memory = RoundWindowMemory("events", summariser=recording_summariser(calls))
+
+    async def play():
+        await memory.add(entry("Player 1 accused Player 2.", 1))
+        memory.start_round(2)
+        await memory.update_context(LayeredChatCompletionContext("You are Player 1."))
+        await memory.add(entry("Player 2 was eliminated.", 1))
+        await memory.update_context(LayeredChatCompletionContext("You are Player 1."))
+
+    asyncio.run(play())
+    assert [round for round, _ in calls] == [1, 1]
+    assert calls[-1][1] == ["Player 1 accused Player 2.", "Player 2 was eliminated."]
+    assert contents(memory) == ["Round 1: 2 entries"]
+
+
+def test_entries_without_a_round_belong_to_the_current_round():
+    memory = RoundWindowMemory("events", summariser=recording_summariser([]))
+
+    async def play():
+        memory.start_round(3)
+        await memory.add(MemoryContent(content="The seer was eliminated.", mime_type=MemoryMimeType.TEXT))
+
+    asyncio.run(play())
+    assert memory.current_round == 3
+    assert contents(memory) == ["The seer was eliminated."]
+
+
+def test_the_current_round_is_kept_within_the_budget_newest_first():
+    memory = RoundWindowMemory("events", token_budget=2 * estimate_tokens("Player 1 voted for Player 2."))
+
+    async def play():
+        for voter in range(1, 5):
+            await memory.add(entry(f"Player {voter} voted for Player 2.", 1))
+
+    asyncio.run(play())
+    assert contents(memory) == ["Player 3 voted for Player 2.", "Player 4 voted for Player 2."]
+
+
+def test_oldest_summaries_are_dropped_first():
+    summary_tokens = estimate_tokens("Round 1: 1 entries")
+    memory = RoundWindowMemory("events", token_budget=2 * summary_tokens, summariser=recording_summariser([]))
+
+    async def play():
+        for round in range(1, 4):
+            await memory.add(entry(f"Something happened in round {round}.", round))
+        memory.start_round(4)
+        await memory.update_context(LayeredChatCompletionContext("You are Player 1."))
+
+    asyncio.run(play())
+    assert contents(memory) == ["Round 2: 1 entries", "Round 3: 1 entries"]
+
+
+def test_tokens_saved_are_recorded_on_the_next_model_call():
+    recorder = TelemetryRecorder()
+    memory = RoundWindowMemory("events", summariser=recording_summariser([]))
+
+    async def play():
+        set_call_tags(game="g")
+        for i in range(5):
+            await memory.add(entry(f"Player {i} accused Player {i + 1} of lying about their role.", 1))
+        memory.start_round(2)
+        await memory.update_context(LayeredChatCompletionContext("You are Player 1."))
+        span, token = recorder.start_call()
+        recorder.end_call(span, token)
+        second, token = recorder.start_call()
+        recorder.end_call(second, token)
+        return span, second
+
+    span, second = asyncio.run(play())
+    assert span.attributes["memory_tokens_saved"] == memory.last_tokens_saved > 0
+    assert "memory_tokens_saved" not in second.attributes
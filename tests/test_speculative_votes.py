@@ -0,0 +1,78 @@
+import asyncio
+
+from autogen_agentchat.messages import TextMessage
+
+from models.agent_vote_response import AgentVoteResponse
+from speculative_votes import SpeculativeVotes
+from terminations.text_mention_from_all_termination import TextMentionFromAllTermination
+
+
+class Voter:
+    """Stands in for a player, recording the transcripts it was asked to vote on."""
+
+    def __init__(self, id: int, delay: float = 0.0):
+        self.id = id
+        self.delay = delay
+        self.transcripts: list[list[str]] = []
+        self.cancelled = 0
+
+    async def make_vote(self, transcript) -> AgentVoteResponse:
+        self.transcripts.append([str(m.content) for m in transcript])
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return AgentVoteResponse(reason="Suspicious.", player_to_eliminate=3)
+
+
+def say(source: str, text: str) -> TextMessage:
+    return TextMessage(content=text, source=source)
+
+
+async def discuss(speculation: SpeculativeVotes, *batches: list[TextMessage]):
+    termination = TextMentionFromAllTermination({"player_1", "player_2"}, "READY", on_ready=speculation.ready)
+    condition = termination | speculation
+    for batch in batches:
+        await condition(batch)
+        await asyncio.sleep(0)
+
+
+def test_a_ready_players_vote_sees_the_batch_they_got_ready_in():
+    voter = Voter(1)
+    speculation = SpeculativeVotes([voter, Voter(2)])
+
+    async def play():
+        await discuss(speculation, [say("player_2", "Hello"), say("player_1", "Player 2 is odd. READY")])
+        return await speculation.vote(voter, [])
+
+    vote = asyncio.run(play())
+    assert vote.player_to_eliminate == 3
+    assert voter.transcripts == [["Hello", "Player 2 is odd. READY"]]
+    assert (speculation.stats.started, speculation.stats.kept, speculation.stats.regenerated) == (1, 1, 0)
+
+
+def test_a_later_mention_regenerates_the_vote():
+    voter = Voter(1, delay=0.01)
+    speculation = SpeculativeVotes([voter, Voter(2)])
+
+    async def play():
+        await discuss(speculation, [say("player_1", "READY")], [say("player_2", "I suspect Player 1")])
+        return await speculation.vote(voter, [])
+
+    asyncio.run(play())
+    assert voter.transcripts == [["READY"], ["READY", "I suspect Player 1"]]
+    assert voter.cancelled == 1
+    assert (speculation.stats.regenerated, speculation.stats.kept) == (1, 1)
+
+
+def test_cancel_waits_for_the_votes_to_unwind():
+    voter = Voter(1, delay=10)
+    speculation = SpeculativeVotes([voter, Voter(2)])
+
+    async def play():
+        await discuss(speculation, [say("player_1", "READY")])
+        await speculation.cancel()
+
+    asyncio.run(play())
+    assert voter.cancelled == 1
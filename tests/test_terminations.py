@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from autogen_agentchat.base import TerminatedException
+from autogen_agentchat.messages import HandoffMessage, TextMessage, ThoughtEvent
+from autogen_core.models import RequestUsage
+
+from terminations.max_turns_per_source_termination import MaxTurnsPerSourceTermination
+from terminations.text_mention_from_all_termination import TextMentionFromAllTermination
+from terminations.token_budget_termination import TokenBudgetTermination
+
+PLAYERS = {"player_1", "player_2", "player_3", "player_4"}
+
+
+def say(source: str, text: str = "Hmm.", tokens: int = 0) -> TextMessage:
+    usage = RequestUsage(prompt_tokens=tokens, completion_tokens=0) if tokens else None
+    return TextMessage(content=text, source=source, models_usage=usage)
+
+
+def run(condition, *batches):
+    async def feed():
+        return [await condition(batch) for batch in batches]
+
+    return asyncio.run(feed())
+
+
+def test_ready_from_all_sources_ends_the_discussion():
+    ready = []
+    condition = TextMentionFromAllTermination({"player_1", "player_2"}, "READY", on_ready=ready.append)
+    results = run(condition, [say("player_1", "READY"), say("player_1", "READY")], [say("player_2", "READY")])
+
+    assert results[0] is None
+    assert results[1] is not None
+    assert ready == ["player_1", "player_2"]
+    assert condition.terminated
+
+
+def test_a_quorum_of_ready_sources_ends_the_discussion():
+    condition = TextMentionFromAllTermination(PLAYERS, "READY", quorum=0.5)
+    results = run(condition, [say("player_1", "READY")], [say("player_3", "READY"), say("user", "READY")])
+
+    assert results[0] is None
+    assert "2 of 4 sources" in results[1].content
+
+
+def test_ready_sources_are_forgotten_on_reset():
+    condition = TextMentionFromAllTermination({"player_1", "player_2"}, "READY")
+    run(condition, [say("player_1", "READY"), say("player_2", "READY")])
+    with pytest.raises(TerminatedException):
+        run(condition, [say("player_1", "READY")])
+
+    asyncio.run(condition.reset())
+    assert not condition.terminated
+    assert run(condition, [say("player_1", "READY")]) == [None]
+
+
+def test_one_source_reaching_the_turn_cap_ends_the_discussion_for_everyone():
+    condition = MaxTurnsPerSourceTermination(2, PLAYERS)
+    results = run(
+        condition,
+        [say("player_1"), ThoughtEvent(content="...", source="player_1"), say("user"), say("player_2")],
+        [HandoffMessage(content="Over to you", source="player_1", target="player_2")],
+    )
+
+    assert results[0] is None
+    assert "player_1 has taken 2 turns" in results[1].content
+    assert condition.terminated
+
+
+def test_turns_are_counted_afresh_after_a_reset():
+    condition = MaxTurnsPerSourceTermination(2)
+    run(condition, [say("player_1"), say("player_1")])
+    asyncio.run(condition.reset())
+
+    assert run(condition, [say("player_1")]) == [None]
+    assert run(condition, [say("player_1")])[0] is not None
+
+
+def test_turns_from_other_sources_are_ignored():
+    condition = MaxTurnsPerSourceTermination(1, {"player_1"})
+    assert run(condition, [say("player_2"), say("player_2")]) == [None]
+
+
+def test_the_token_budget_ends_the_discussion_and_resets():
+    condition = TokenBudgetTermination(100)
+    results = run(condition, [say("player_1", tokens=60)], [say("player_2", tokens=50)])
+
+    assert results[0] is None
+    assert "110 of 100" in results[1].content
+    asyncio.run(condition.reset())
+    assert condition.total_tokens == 0
+    assert not condition.terminated
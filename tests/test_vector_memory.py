@@ -0,0 +1,42 @@
+import asyncio
+
+from autogen_core.memory import MemoryContent, MemoryMimeType
+
+from memory.vector_memory import VectorMemory
+
+
+def entry(text: str) -> MemoryContent:
+    return MemoryContent(content=text, mime_type=MemoryMimeType.TEXT)
+
+
+def fill(memory: VectorMemory, texts: list[str]):
+    async def add():
+        for text in texts:
+            await memory.add(entry(text))
+        await memory.close()
+
+    asyncio.run(add())
+
+
+def test_a_persisted_index_is_reopened_and_grown_in_place(tmp_path):
+    path = str(tmp_path / "events")
+    first = [f"Player {i} accused Player {i + 1}." for i in range(3)]
+    fill(VectorMemory("events", k=1, path=path, initial_capacity=2), first)
+
+    reopened = VectorMemory("events", k=1, path=path, initial_capacity=2)
+    assert len(reopened) == 3
+    fill(reopened, [f"Player {i} voted for Player {i + 2}." for i in range(3)])
+
+    memory = VectorMemory("events", k=1, path=path)
+    assert len(memory) == 6
+    assert [str(c.content) for c in memory.search("Player 1 accused Player 2.")] == ["Player 1 accused Player 2."]
+    assert [str(c.content) for c in memory.search("Player 2 voted for Player 4.")] == ["Player 2 voted for Player 4."]
+
+
+def test_truncating_drops_later_entries_from_the_persisted_index(tmp_path):
+    path = str(tmp_path / "events")
+    memory = VectorMemory("events", k=8, path=path)
+    fill(memory, ["one", "two", "three"])
+    memory.truncate(1)
+
+    assert [str(c.content) for c in VectorMemory("events", path=path).search("two")] == ["one"]
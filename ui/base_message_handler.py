@@ -0,0 +1,140 @@
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional, TypeVar
+
+from autogen_agentchat.base import Response, TaskResult
+from autogen_agentchat.messages import (
+    BaseAgentEvent,
+    BaseChatMessage,
+    ModelClientStreamingChunkEvent,
+    ThoughtEvent,
+    TextMessage,
+    ToolCallExecutionEvent,
+)
+
+T = TypeVar("T", bound=TaskResult | Response)
+
+
+@dataclass
+class StreamedTurn:
+    """Delivery stats for one streamed agent turn."""
+
+    author: str
+    time_to_first_token: float
+    chunks: int = 0
+    chars: int = 0
+    frames: int = 0
+
+
+class BaseMessageHandler(ABC):
+    """Where the game sends its messages. Subclasses decide how (and whether) they're displayed.
+
+    Streamed model output is coalesced: chunks are buffered and written out at most every `flush_interval` seconds
+    or `flush_chars` characters, rather than as one UI update per token.
+    """
+
+    flush_interval = 0.1
+    flush_chars = 200
+
+    def __init__(self):
+        self.streamed_turns: list[StreamedTurn] = []
+        self._stream: Optional[StreamedTurn] = None
+        self._stream_buffer: list[str] = []
+        self._stream_text: list[str] = []
+        self._last_flush = 0.0
+
+    @abstractmethod
+    async def send_message(self, message: str, author: Optional[str] = None):
+        """Send a message to the UI."""
+
+    @abstractmethod
+    async def send_task(self, title: str):
+        """Send a completed task (e.g. a tool call) to the UI."""
+
+    async def flush(self):
+        """Send anything the handler has batched up, e.g. at the end of a phase."""
+
+    async def open_stream(self, author: str):
+        """Start a message that will be filled in by `write_stream`."""
+        self._stream_text = []
+
+    async def write_stream(self, text: str):
+        """Append text to the open streamed message."""
+        self._stream_text.append(text)
+
+    async def close_stream(self, author: str):
+        """Finish the open streamed message."""
+        await self.send_message("".join(self._stream_text), author)
+
+    async def _stream_chunk(self, content: str, author: str, turn_start: float):
+        if self._stream is not None and self._stream.author != author:
+            await self._end_stream()
+        if self._stream is None:
+            self._stream = StreamedTurn(author=author, time_to_first_token=time.perf_counter() - turn_start)
+            self.streamed_turns.append(self._stream)
+            self._last_flush = time.perf_counter()
+            await self.open_stream(author)
+
+        self._stream_buffer.append(content)
+        self._stream.chunks += 1
+        self._stream.chars += len(content)
+        buffered = sum(len(c) for c in self._stream_buffer)
+        if time.perf_counter() - self._last_flush >= self.flush_interval or buffered >= self.flush_chars:
+            await self._flush_stream()
+
+    async def _flush_stream(self):
+        if self._stream_buffer:
+            await self.write_stream("".join(self._stream_buffer))
+            self._stream.frames += 1
+            self._stream_buffer = []
+        self._last_flush = time.perf_counter()
+
+    async def _end_stream(self) -> bool:
+        """Flush and close the open streamed message, returning whether there was one."""
+        if self._stream is None:
+            return False
+        await self._flush_stream()
+        await self.close_stream(self._stream.author)
+        self._stream.frames += 1
+        self._stream = None
+        return True
+
+    async def send_message_stream(
+        self, stream: AsyncGenerator[BaseAgentEvent | BaseChatMessage | T, None]
+    ) -> TaskResult:
+        """Stream messages to the UI."""
+        # Time to first token is measured from the event that prompted the next model call
+        turn_start = time.perf_counter()
+        async for message in stream:
+            match message:
+                case TaskResult():
+                    await self._end_stream()
+                    return message
+                case ModelClientStreamingChunkEvent():
+                    await self._stream_chunk(message.content, message.source, turn_start)
+                    continue
+                case ToolCallExecutionEvent():
+                    await self._end_stream()
+                    for content in message.content:
+                        await self.send_task(content.content)
+                case ThoughtEvent() | TextMessage():
+                    # The full message repeats what was already streamed, so only send it if it wasn't
+                    if not await self._end_stream():
+                        await self.send_message(message.content, message.source)
+            turn_start = time.perf_counter()
+
+    def stream_summary(self) -> str:
+        turns = len(self.streamed_turns)
+        if not turns:
+            return "Streaming: no streamed turns"
+        ttft = sum(t.time_to_first_token for t in self.streamed_turns) / turns
+        frames = sum(t.frames for t in self.streamed_turns) / turns
+        chunks = sum(t.chunks for t in self.streamed_turns) / turns
+        return (
+            f"Streaming: {turns} turns, avg time to first token {ttft:.2f}s, "
+            f"avg {frames:.1f} UI frames for {chunks:.1f} chunks per turn"
+        )
+
+    async def close(self):
+        """Release any resources held by the handler."""
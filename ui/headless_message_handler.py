@@ -0,0 +1,45 @@
+import json
+from typing import Optional
+
+from ui.base_message_handler import BaseMessageHandler
+
+
+class NullMessageHandler(BaseMessageHandler):
+    """Discards every message, for running games without a UI."""
+
+    async def send_message(self, message: str, author: Optional[str] = None):
+        pass
+
+    async def send_task(self, title: str):
+        pass
+
+
+class ConsoleMessageHandler(BaseMessageHandler):
+    """Prints every message to stdout, for watching a single game from the terminal."""
+
+    async def send_message(self, message: str, author: Optional[str] = None):
+        print(f"{author}: {message}" if author else message, flush=True)
+
+    async def send_task(self, title: str):
+        print(f"[{title}]", flush=True)
+
+
+class JsonlMessageHandler(BaseMessageHandler):
+    """Appends every message to a JSONL file, one event per line."""
+
+    def __init__(self, path: str, game_id: Optional[str] = None):
+        super().__init__()
+        self.game_id = game_id
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _write(self, record: dict):
+        self._file.write(json.dumps({"game": self.game_id, **record}) + "\n")
+
+    async def send_message(self, message: str, author: Optional[str] = None):
+        self._write({"type": "message", "author": author or "host", "content": message})
+
+    async def send_task(self, title: str):
+        self._write({"type": "task", "content": title})
+
+    async def close(self):
+        self._file.close()
@@ -1,22 +1,14 @@
 import chainlit as cl
 
-from typing import AsyncGenerator, Optional, TypeVar
-from autogen_agentchat.base import Response, TaskResult
-from autogen_agentchat.messages import (
-    BaseAgentEvent,
-    BaseChatMessage,
-    ThoughtEvent,
-    TextMessage,
-    ToolCallExecutionEvent
-)
+from typing import Optional
 
+from ui.base_message_handler import BaseMessageHandler
 from ui.task_handler import TaskHandler
 
-T = TypeVar("T", bound=TaskResult | Response)
 
-
-class MessageHandler:
+class MessageHandler(BaseMessageHandler):
     def __init__(self):
+        super().__init__()
         self.task_handler = TaskHandler()
         self.current_message = None
         pass
@@ -29,14 +21,23 @@ class MessageHandler:
             author=author
         ).send()
 
-    async def send_message_stream(self, stream: AsyncGenerator[BaseAgentEvent | BaseChatMessage | T, None]) -> TaskResult:
-        """Stream messages to the UI."""
-        async for message in stream:
-            match message:
-                case TaskResult():
-                    return message
-                case ToolCallExecutionEvent():
-                    for content in message.content:
-                        await self.task_handler.send_task(content.content)
-                case ThoughtEvent() | TextMessage():
-                    await self.send_message(message.content, message.source)
+    async def open_stream(self, author: str):
+        """Start a message that streamed chunks are written into."""
+        self.current_message = cl.Message(content=f"[{author}] ", author=author)
+
+    async def write_stream(self, text: str):
+        """Append coalesced chunks to the streamed message."""
+        await self.current_message.stream_token(text)
+
+    async def close_stream(self, author: str):
+        """Finalise the streamed message."""
+        await self.current_message.send()
+        self.current_message = None
+
+    async def send_task(self, title: str):
+        """Send a task to the UI."""
+        await self.task_handler.send_task(title)
+
+    async def flush(self):
+        """Send any batched task updates."""
+        await self.task_handler.flush()
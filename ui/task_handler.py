@@ -1,9 +1,34 @@
+import time
+from typing import Callable, Optional
+
 import chainlit as cl
 
 
 class TaskHandler:
-    def __init__(self):
+    """Shows tool executions (e.g. recorded thoughts) as a task list in the UI.
+
+    Chainlit re-sends the whole task list on every update, so rather than sending after each task, new tasks are
+    batched and sent at most every `flush_interval` seconds (and at the end of each phase via `flush`). Only the
+    latest `max_tasks` are kept, so each update stays a bounded size however long the game runs. The interval is
+    measured with `clock` (seconds).
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 2.0,
+        max_tasks: Optional[int] = 50,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self._task_list = None
+        self.flush_interval = flush_interval
+        self.max_tasks = max_tasks
+        self.clock = clock
+        self._pending = 0
+        self._last_flush = 0.0
+
+        # Task list updates sent to the UI, and their total size
+        self.round_trips = 0
+        self.bytes_sent = 0
 
     async def _get_task_list(self):
         """Lazily initialize and return the task list."""
@@ -12,9 +37,29 @@ class TaskHandler:
         return self._task_list
 
     async def send_task(self, title: str):
-        """Send a task to the UI."""
+        """Add a task, sending the task list to the UI if it hasn't been sent recently."""
         task_list = await self._get_task_list()
 
         task = cl.Task(title=title, status=cl.TaskStatus.DONE)
         await task_list.add_task(task)
+        self._pending += 1
+
+        if self.clock() - self._last_flush >= self.flush_interval:
+            await self.flush()
+
+    async def flush(self):
+        """Send any tasks added since the last update."""
+        if not self._pending:
+            return
+        task_list = await self._get_task_list()
+        if self.max_tasks is not None:
+            del task_list.tasks[: max(0, len(task_list.tasks) - self.max_tasks)]
+
+        await self._send(task_list)
+        self.round_trips += 1
+        self.bytes_sent += len(task_list.content.encode("utf-8"))
+        self._pending = 0
+        self._last_flush = self.clock()
+
+    async def _send(self, task_list: cl.TaskList):
         await task_list.send()
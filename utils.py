@@ -1,8 +1,19 @@
+import logging
 import random
 from collections import Counter
 
+# Libraries that log every message and request at INFO level
+NOISY_LOGGERS = ("autogen_core", "autogen_agentchat", "httpx")
 
-def count_votes(votes: list[int]) -> int:
+
+def configure_logging(level: int = logging.INFO):
+    """Log the game's status messages to stderr at the given level, keeping the libraries' logs to warnings."""
+    logging.basicConfig(level=level, format="%(levelname)s %(message)s")
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(max(level, logging.WARNING))
+
+
+def count_votes(votes: list[int], rng: random.Random | None = None) -> int:
     # Check the votes and announce the results
     vote_count = Counter(votes)
     top_voted_players = [player for player, count in vote_count.items() if count == max(vote_count.values())]
@@ -10,7 +21,7 @@ def count_votes(votes: list[int]) -> int:
 
     if len(top_voted_players) > 1:
         print("There was a tie for the most votes. The elimination will be decided by a random draw.")
-        eliminated_player = random.choice(top_voted_players)
+        eliminated_player = (rng or random).choice(top_voted_players)
     else:
         eliminated_player = top_voted_players[0]
         print(f"Player {eliminated_player} has the most votes.")